@@ -0,0 +1,244 @@
+"""Benchmarks for RangeSet.
+
+Each benchmark builds its input for a given size ``n`` and returns a
+function that performs ``OPS`` operations (or one bulk operation) on it.
+The input is rebuilt for every repetition.
+The benchmark's ``complexity`` is the documented cost of one call of
+that function, as a function of ``n``; the runner uses it to flag
+operations that grow faster than they should.
+
+Run ``python3 -m bench --help`` for options.
+"""
+
+import math
+import pickle
+import random
+
+from range_set import IntervalArray, IntervalChunks, IntervalList, RangeSet
+
+__all__ = ["BENCHMARKS", "STORES", "OPS", "bench"]
+
+OPS = 1000
+
+STORES = {
+    "list": IntervalList,
+    "array": IntervalArray,
+    "chunks": IntervalChunks,
+}
+
+COMPLEXITY = {
+    "1": lambda n: 1,
+    "log": lambda n: math.log2(n),
+    "n": lambda n: n,
+    "nlogn": lambda n: n * math.log2(n),
+}
+
+BENCHMARKS = {}
+
+
+def bench(name, complexity, baseline=None):
+    """Register a benchmark.
+
+    ``complexity`` is a key of ``COMPLEXITY``. If the benchmark's store
+    argument is ``None``, it should measure the equivalent operation on
+    a builtin ``set``; ``baseline`` is the complexity of that.
+    """
+
+    def deco(fn):
+        BENCHMARKS[name] = (fn, complexity, baseline)
+        return fn
+
+    return deco
+
+
+def fragmented(n, store, offset=0):
+    """A set with ``n`` intervals of length 1, separated by holes of 1."""
+    return RangeSet.from_sorted(range(offset, offset + 2 * n, 2), store=store)
+
+
+def probes(n):
+    rnd = random.Random(n)
+    return [rnd.randrange(2 * n) for _ in range(OPS)]
+
+
+@bench("add_sequential", "1", "1")
+def add_sequential(n, store):
+    vals = range(2 * n, 2 * n + OPS)
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+        return lambda: s.update(vals)
+    s = fragmented(n, store)
+
+    def run():
+        for x in vals:
+            s.add(x)
+
+    return run
+
+
+@bench("ingest_sequential", "1", "1")
+def ingest_sequential(n, store):
+    # mostly ascending, slightly out of order
+    rnd = random.Random(n)
+    vals = [2 * n + x + rnd.randrange(-2, 3) for x in range(OPS)]
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+        return lambda: s.update(vals)
+    s = fragmented(n, store)
+
+    def run():
+        with s.ingest() as ing:
+            for x in vals:
+                ing.add(x)
+
+    return run
+
+
+@bench("add_random", "n", "1")
+def add_random(n, store):
+    # odd numbers always land in a hole of a fragmented set
+    vals = [x | 1 for x in probes(n)]
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+        return lambda: s.update(vals)
+    s = fragmented(n, store)
+
+    def run():
+        for x in vals:
+            s.add(x)
+
+    return run
+
+
+@bench("add_adversarial", "n", "1")
+def add_adversarial(n, store):
+    # every addition creates a new interval in the middle of the set
+    vals = [(x | 1) * 4 for x in probes(n)]
+    if store is None:
+        s = set(range(0, 8 * n, 8))
+        return lambda: s.update(vals)
+    s = RangeSet.from_sorted(range(0, 8 * n, 8), store=store)
+
+    def run():
+        for x in vals:
+            s.add(x + 1)
+
+    return run
+
+
+@bench("remove_random", "n", "1")
+def remove_random(n, store):
+    # splits an interval in the middle, every time
+    vals = [x * 4 + 1 for x in probes(n)]
+    if store is None:
+        s = set(range(8 * n))
+        return lambda: s.difference_update(vals)
+    s = RangeSet.from_sorted(((x * 4, x * 4 + 3) for x in range(2 * n)), store=store)
+
+    def run():
+        for x in vals:
+            s.discard(x)
+
+    return run
+
+
+@bench("find", "log")
+def find(n, store):
+    if store is None:
+        return None
+    s = fragmented(n, store)
+    vals = probes(n)
+
+    def run():
+        f = s._find
+        for x in vals:
+            f(x)
+
+    return run
+
+
+@bench("contains", "log", "1")
+def contains(n, store):
+    vals = probes(n)
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+    else:
+        s = fragmented(n, store)
+
+    def run():
+        for x in vals:
+            x in s  # noqa: B015
+
+    return run
+
+
+def _algebra(op):
+    def mk(n, store):
+        if store is None:
+            a = set(range(0, 2 * n, 2))
+            b = set(range(1, 2 * n, 3))
+        else:
+            a = fragmented(n, store)
+            b = RangeSet.from_sorted(range(1, 2 * n, 3), store=store)
+        return lambda: op(a, b)
+
+    return mk
+
+
+for _name, _op in (
+    ("union", lambda a, b: a | b),
+    ("intersection", lambda a, b: a & b),
+    ("difference", lambda a, b: a - b),
+    ("symmetric_difference", lambda a, b: a ^ b),
+):
+    bench(_name, "n", "n")(_algebra(_op))
+
+
+@bench("contains_sequential", "1", "1")
+def contains_sequential(n, store):
+    # an advancing cursor
+    vals = range(n - OPS // 2, n + OPS // 2)
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+    else:
+        s = fragmented(n, store)
+
+    def run():
+        for x in vals:
+            x in s  # noqa: B015
+
+    return run
+
+
+@bench("count", "1", "1")
+def count(n, store):
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+        return lambda: len(s)
+    s = fragmented(n, store)
+    s.count()
+
+    def run():
+        s.add(2 * n + 10)
+        s.discard(2 * n + 10)
+        return s.count()
+
+    return run
+
+
+@bench("copy", "n", "n")
+def copy(n, store):
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+    else:
+        s = fragmented(n, store)
+    return s.copy
+
+
+@bench("pickle", "n", "n")
+def pickle_roundtrip(n, store):
+    if store is None:
+        s = set(range(0, 2 * n, 2))
+    else:
+        s = fragmented(n, store)
+    return lambda: pickle.loads(pickle.dumps(s))
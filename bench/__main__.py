@@ -0,0 +1,154 @@
+"""Run the RangeSet benchmarks.
+
+Prints a table, or JSON with ``--json``. With ``--check``, exits with
+status 1 if some operation grows faster than its documented complexity.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from importlib.metadata import version
+
+from . import BENCHMARKS, COMPLEXITY, STORES
+
+
+def measure(fn, n, store, repeat):
+    """Set up and run a benchmark ``repeat`` times, return the best time.
+
+    Returns ``None`` if the benchmark doesn't apply to this store.
+    """
+    best = None
+    for _ in range(repeat):
+        run = fn(n, store)
+        if run is None:
+            return None
+        t = time.perf_counter()
+        run()
+        t = time.perf_counter() - t
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def check_scaling(results, tolerance):
+    """Compare the growth of each benchmark between consecutive sizes to
+    its documented complexity. Returns a list of problems."""
+    problems = []
+    series = {}
+    for r in results:
+        series.setdefault((r["name"], r["store"]), []).append(r)
+    for (name, store), rs in series.items():
+        rs.sort(key=lambda r: r["size"])
+        f = COMPLEXITY[rs[0]["complexity"]]
+        for a, b in zip(rs, rs[1:]):
+            expected = f(b["size"]) / f(a["size"])
+            actual = b["seconds"] / max(a["seconds"], 1e-9)
+            if actual > expected * tolerance:
+                problems.append(
+                    {
+                        "name": name,
+                        "store": store,
+                        "sizes": [a["size"], b["size"]],
+                        "expected": expected,
+                        "actual": actual,
+                    }
+                )
+    return problems
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python3 -m bench", description=__doc__)
+    p.add_argument(
+        "-s",
+        "--sizes",
+        default="1000,10000,100000",
+        help="comma-separated set sizes (default: %(default)s)",
+    )
+    p.add_argument(
+        "--store",
+        action="append",
+        choices=sorted(STORES),
+        help="store(s) to benchmark (default: all)",
+    )
+    p.add_argument("-b", "--bench", action="append", help="benchmark(s) to run (default: all)")
+    p.add_argument("-r", "--repeat", type=int, default=3, help="repetitions, best one counts")
+    p.add_argument("--no-baseline", action="store_true", help="don't measure the builtin set")
+    p.add_argument("-j", "--json", metavar="FILE", help="write JSON results to FILE ('-': stdout)")
+    p.add_argument("--check", action="store_true", help="fail if scaling exceeds complexity")
+    p.add_argument(
+        "--tolerance",
+        type=float,
+        default=3.0,
+        help="allowed factor over the documented growth (default: %(default)s)",
+    )
+    args = p.parse_args(argv)
+
+    sizes = [int(float(x)) for x in args.sizes.split(",")]
+    stores = args.store or list(STORES)
+    names = args.bench or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            p.error("unknown benchmark: %s" % name)
+
+    results = []
+    out = sys.stderr if args.json == "-" else sys.stdout
+    for name in names:
+        fn, complexity, baseline = BENCHMARKS[name]
+        runs = [(s, STORES[s], complexity) for s in stores]
+        if baseline is not None and not args.no_baseline:
+            runs.append(("set", None, baseline))
+        for store_name, store, cplx in runs:
+            for n in sizes:
+                t = measure(fn, n, store, args.repeat)
+                if t is None:
+                    continue
+                results.append(
+                    {
+                        "name": name,
+                        "store": store_name,
+                        "size": n,
+                        "seconds": t,
+                        "complexity": cplx,
+                    }
+                )
+                print("%-22s %-7s %10d %12.6f" % (name, store_name, n, t), file=out)
+
+    problems = check_scaling(results, args.tolerance)
+    for pr in problems:
+        print(
+            "SCALING: %s/%s grew %.1fx from %d to %d, expected %.1fx"
+            % (
+                pr["name"],
+                pr["store"],
+                pr["actual"],
+                pr["sizes"][0],
+                pr["sizes"][1],
+                pr["expected"],
+            ),
+            file=sys.stderr,
+        )
+
+    if args.json:
+        data = {
+            "version": version("range_set"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "results": results,
+            "scaling": problems,
+        }
+        if args.json == "-":
+            json.dump(data, sys.stdout, indent=2)
+        else:
+            with open(args.json, "w") as f:
+                json.dump(data, f, indent=2)
+
+    if args.check and problems:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
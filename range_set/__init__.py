@@ -0,0 +1,1285 @@
+"""Top-level package for RangeSet."""
+
+from bisect import bisect_right
+from functools import partial
+from heapq import heapify, heappop, heapreplace
+from itertools import islice
+from sys import getrefcount
+from importlib.metadata import version  # part of setuptools
+
+from . import serial
+from .store import IntervalArray, IntervalChunks, IntervalList, IntervalView
+
+_version = version("range_set")
+del version
+
+_version_tuple = tuple(int(x) for x in _version.split("."))
+
+__all__ = [
+    "RangeSet",
+    "FrozenRangeSet",
+    "RangeSetComplement",
+    "RangeSetIngester",
+    "MappedRangeSet",
+    "ConcurrentRangeSet",
+    "AsyncRangeSet",
+    "HybridRangeSet",
+    "CodedRangeSet",
+    "RangeDict",
+    "JournaledRangeSet",
+    "InstrumentedRangeSet",
+    "RangeSetStats",
+    "IntervalList",
+    "IntervalArray",
+    "IntervalChunks",
+]
+
+# Truth tables for ``_merge``, indexed by ``in_a | (in_b << 1)``.
+_OR = (False, True, True, True)
+_AND = (False, False, False, True)
+_SUB = (False, True, False, False)
+_XOR = (False, True, True, False)
+
+
+def _merge(a, b, op, res):
+    """Combine two sorted, coalesced interval sequences.
+
+    This is a single sweep across the boundaries of both inputs, so it
+    runs in O(n+m). ``op`` is one of the truth tables above; it decides
+    whether a point that is (or is not) in ``a`` and/or ``b`` is part of
+    the result.
+
+    The result is appended to the (empty) store ``res``, which is returned.
+    """
+    ea = iter(a.edges())
+    eb = iter(b.edges())
+    pa = next(ea, None)
+    pb = next(eb, None)
+    state = 0
+    inside = False
+    start = None
+
+    while True:
+        # Once one side is exhausted, stop if the rest of the other side
+        # cannot contribute to the result.
+        if pb is None:
+            if pa is None or not op[1]:
+                break
+            x = pa
+            state ^= 1
+            pa = next(ea, None)
+        elif pa is None or pb < pa:
+            if pa is None and not op[2]:
+                break
+            x = pb
+            state ^= 2
+            pb = next(eb, None)
+        elif pa < pb:
+            x = pa
+            state ^= 1
+            pa = next(ea, None)
+        else:
+            x = pa
+            state ^= 3
+            pa = next(ea, None)
+            pb = next(eb, None)
+
+        if op[state] is not inside:
+            if inside:
+                res.append((start, x))
+            else:
+                start = x
+            inside = not inside
+    return res
+
+
+def _merge_many(stores, need, res):
+    """Combine any number of sorted, coalesced interval sequences.
+
+    A point is part of the result if it is contained in at least ``need``
+    of the inputs. This is a single sweep across all boundaries, using a
+    heap to find the next one, so it runs in O(N log k).
+
+    The result is appended to the (empty) store ``res``, which is returned.
+    """
+    heap = []
+    for i, s in enumerate(stores):
+        it = iter(s.edges())
+        x = next(it, None)
+        if x is not None:
+            heap.append((x, i, 1, it))
+    heapify(heap)
+
+    depth = 0
+    inside = False
+    start = None
+    while len(heap) >= need:
+        x = heap[0][0]
+        while heap and heap[0][0] == x:
+            _, i, d, it = heap[0]
+            depth += d
+            y = next(it, None)
+            if y is None:
+                heappop(heap)
+            else:
+                heapreplace(heap, (y, i, -d, it))
+
+        if (depth >= need) is not inside:
+            if inside:
+                res.append((start, x))
+            else:
+                start = x
+            inside = not inside
+    return res
+
+
+def _np_merge(np, ea, eb, op):
+    """Vectorized version of ``_merge``.
+
+    ``ea`` and ``eb`` are flat NumPy arrays of interval boundaries.
+    Returns the boundaries of the result.
+    """
+    pos = np.concatenate((ea, eb))
+    flip = np.concatenate((np.full(len(ea), 1, np.int8), np.full(len(eb), 2, np.int8)))
+    order = np.argsort(pos, kind="stable")
+    pos = pos[order]
+    state = np.bitwise_xor.accumulate(flip[order])
+
+    # When both inputs have a boundary at the same position, only the
+    # state after the second one counts.
+    last = np.ones(len(pos), dtype=bool)
+    last[:-1] = pos[1:] != pos[:-1]
+    pos = pos[last]
+    inside = np.asarray(op)[state[last]]
+
+    changed = inside.copy()
+    changed[1:] ^= inside[:-1]
+    return pos[changed]
+
+
+def _np_runs(np, v):
+    """Collapse a sorted array of distinct integers into flat boundaries."""
+    if not len(v):
+        return v
+    brk = np.flatnonzero(np.diff(v) != 1) + 1
+    res = np.empty(2 * len(brk) + 2, dtype=v.dtype)
+    res[0::2] = v[np.concatenate(([0], brk))]
+    res[1::2] = v[np.concatenate((brk - 1, [len(v) - 1]))] + 1
+    return res
+
+
+_FP_MOD = (1 << 61) - 1
+
+
+def _fp(a, b):
+    """Return the fingerprint of the interval [a…b).
+
+    This mixes both boundaries non-linearly, so the sum of the
+    fingerprints of a set's intervals depends on how the set is split.
+    """
+    x = (a * 0x9E3779B97F4A7C15 + b * 0xC2B2AE3D27D4EB4F + 0x165667B19E3779F9) % _FP_MOD
+    return x * x % _FP_MOD * x % _FP_MOD
+
+
+def _coalesce(items, res):
+    """Coalesce a sequence of ``(start, end)`` tuples, sorted by start,
+    into non-overlapping, non-adjacent intervals, which are appended
+    to the (empty) store ``res``. Empty intervals are skipped.
+    """
+    x = y = None
+    for a, b in items:
+        if a >= b:
+            continue
+        if y is not None and a <= y:
+            if b > y:
+                y = b
+            continue
+        if y is not None:
+            res.append((x, y))
+        x, y = a, b
+    if y is not None:
+        res.append((x, y))
+    return res
+
+
+def _tuples(iter):
+    """Convert single values to ``(x, x+1)`` tuples."""
+    for x in iter:
+        if isinstance(x, tuple):
+            yield x
+        else:
+            yield (x, x + 1)
+
+
+def _owners(s):
+    """Return the reference count of ``s._shared``, the token of the sets
+    that use ``s._set``. Compare it to ``_SOLE``."""
+    return getrefcount(s._shared)
+
+
+class _Probe:
+    __slots__ = ("_shared",)
+
+
+_probe = _Probe()
+_probe._shared = object()
+# The result of ``_owners`` if only one set holds the token; measured
+# because temporary references differ between Python versions.
+_SOLE = _owners(_probe)
+del _probe
+
+
+class RangeSet:
+    """
+    A RangeSet works exactly like a Python set, with these exceptions:
+
+    * iterating a set yields a sequence of ``(start, end)`` tuples.
+      The start value is part of the set while the end value is not.
+
+    * You can add or remove single values as well as ``(start, end)`` tuples.
+
+    * Likewise, initialization works with an iterator that yields single
+      values or ``(start, end)`` tuples. These tuples may overlap.
+
+    * ``FrozenRangeSet`` is an immutable, hashable variant.
+
+    * You can only store integers.
+
+    * Worst-case behavior for inserting or removing a value is O(n).
+
+    * On the other hand, best-case behavior (for lists with no or few holes) is
+      O(1) regardless of the size of the list.
+
+    * The intervals are kept in a store, which defaults to a list of
+      tuples. Pass ``store=IntervalArray`` for a more compact store, or
+      ``store=IntervalChunks`` for O(log n) insertion and removal
+      (see `range_set.store`).
+    """
+
+    __slots__ = ("_set", "_count", "_fp", "_prefix", "_shared", "__weakref__")
+
+    def __init__(self, iter=None, store=None):
+        self._set = (store or IntervalList)()
+        self._count = None
+        self._fp = None
+        self._prefix = None
+        self._shared = None
+        if isinstance(iter, RangeSet) and store is None:
+            self._share(iter)
+        elif iter is not None:
+            items = []
+            append = items.append
+            last = None
+            ordered = True
+            for x in _tuples(iter):
+                if ordered and last is not None and x[0] < last:
+                    ordered = False
+                last = x[0]
+                append(x)
+            if not ordered:
+                items.sort()
+            _coalesce(items, self._set)
+
+    @classmethod
+    def from_sorted(cls, iter, store=None):
+        """Create a set from values and/or ``(start, end)`` tuples which
+        are sorted by their start value. They may overlap.
+
+        This method does not check whether its input is in fact sorted.
+        """
+        s = cls(store=store)
+        s._replace(_coalesce(_tuples(iter), s._set.new()))
+        return s
+
+    @classmethod
+    def from_iterable(cls, iter, store=None):
+        """Create a set from values and/or ``(start, end)`` tuples
+        in arbitrary order.
+        """
+        s = cls(store=store)
+        s._replace(_coalesce(sorted(_tuples(iter)), s._set.new()))
+        return s
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, repr(self._set))
+
+    def __getstate__(self):
+        def state():
+            for x, y in self._set:
+                if x + 1 == y:
+                    yield x
+                else:
+                    yield (x, y)
+
+        items = list(state())
+        s = self._set
+        if type(s) is IntervalList:
+            return items
+        if isinstance(s, IntervalChunks):
+            return (partial(IntervalChunks, load=s._load), items)
+        # views are copied to arrays
+        return (type(s.new()), items)
+
+    def __setstate__(self, state):
+        store = IntervalList
+        if isinstance(state, tuple):
+            store, state = state
+        s = store()
+        for x in state:
+            if isinstance(x, list):
+                assert len(x) == 2
+                s.append((x[0], x[1]))
+            elif isinstance(x, tuple):
+                assert len(x) == 2
+                s.append(x)
+            else:
+                s.append((x, x + 1))
+        self._replace(s)
+
+    def to_bytes(self, checksum=False, fixed=None):
+        """Return a compact binary representation of this set.
+
+        Arguments:
+          ``checksum``: if set, append a CRC32 that ``from_bytes`` verifies.
+          ``fixed``: force (``True``) or prevent (``False``) storing the
+            boundaries as 64-bit integers. By default the shorter
+            encoding is used.
+
+        See `range_set.serial` for the format.
+        """
+        return serial.encode(self._set, checksum=checksum, fixed=fixed)
+
+    def to_file(self, path):
+        """Write this set to a file that ``MappedRangeSet`` can open."""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(fixed=True))
+
+    @classmethod
+    def from_bytes(cls, data, store=None):
+        """Create a set from the result of ``to_bytes``.
+
+        ``data`` may be any bytes-like object. Raises ``ValueError`` if
+        it cannot be decoded.
+        """
+        s = cls(store=store)
+        s._replace(s._set.new_edges(serial.decode(data)))
+        return s
+
+    def _find(self, x):
+        """Return the position of x within the array.
+        (n, False) means that x is after position n.
+        (n, True) means that x is within position n.
+        n==-1 means before the beginning of the array.
+
+        This method cannot be called with empty lists.
+
+        ``add`` and ``remove`` call this method with the element shifted
+        away from the range's edge, i.e. they behave as if the element just
+        on the boundary of an interval is not actually part of that
+        interval. This simplifies their algorithm considerably.
+        """
+        return self._set.find(x)
+
+    def _replace(self, data):
+        """Use the store ``data`` for this set."""
+        self._set = data
+        self._count = None
+        self._fp = None
+        self._prefix = None
+        self._shared = None
+
+    def _share(self, other):
+        """Use the store of ``other`` for this set, until either of them is
+        modified.
+
+        Sets that share a store also share a token object in ``_shared``.
+        Its reference count tells whether other sets still use the store.
+        """
+        if other._shared is None:
+            other._shared = object()
+        self._set = other._set
+        self._count = other._count
+        self._fp = other._fp
+        self._prefix = other._prefix
+        self._shared = other._shared
+
+    def _unshare(self):
+        """We're about to change our store: copy it if other sets still use
+        it."""
+        # views are read-only, so they are copied in any case
+        if _owners(self) > _SOLE or type(self._set) is IntervalView:
+            self._set = self._set.copy()
+        self._shared = None
+
+    def freeze(self):
+        """Return an immutable copy of this set.
+
+        The copy shares this set's storage until this set is modified.
+        """
+        return FrozenRangeSet(self)
+
+    def __iter__(self):
+        return self._set.__iter__()
+
+    def __reversed__(self):
+        return reversed(self._set)
+
+    def irange(self, x=None, y=None, clip=True, reverse=False):
+        """Iterate over the intervals that overlap the range [x…y).
+
+        Arguments:
+          ``x``, ``y``: the range. ``None`` means unbounded.
+          ``clip``: if set (the default), cut the first and last interval
+            to the range.
+          ``reverse``: iterate in descending order.
+
+        This takes O(log n) to locate the range. The intervals are then
+        fetched by position, which is O(1) per interval for all stores
+        except ``IntervalChunks``.
+        """
+        s = self._set
+        if not s or (x is not None and y is not None and x >= y):
+            return
+        p = 0
+        if x is not None:
+            p, pi = self._find(x)
+            if not pi:
+                p += 1
+        q = len(s) - 1
+        if y is not None:
+            q, _ = self._find(y - 1)
+
+        it = range(q, p - 1, -1) if reverse else range(p, q + 1)
+        for i in it:
+            a, b = s[i]
+            if clip:
+                if x is not None and a < x:
+                    a = x
+                if y is not None and b > y:
+                    b = y
+            yield (a, b)
+
+    def overlapping(self, x, y):
+        """Iterate over the intervals that overlap the range [x…y),
+        without clipping them."""
+        return self.irange(x, y, clip=False)
+
+    def gaps(self, lo=None, hi=None):
+        """Iterate over the holes in the set, as ``(start, end)`` tuples.
+
+        Arguments:
+          ``lo``, ``hi``: the range to look at. If ``None``, the range
+            ends at the first (or last) interval.
+        """
+        prev = lo
+        for a, b in self.irange(lo, hi):
+            if prev is not None and prev < a:
+                yield (prev, a)
+            prev = b
+        if hi is not None and prev is not None and prev < hi:
+            yield (prev, hi)
+
+    def complement(self, universe):
+        """Return a view of the elements that are in the range
+        ``universe``, a ``(start, end)`` tuple, but not in this set.
+
+        The view does not copy the set and reflects later changes to it.
+        """
+        return RangeSetComplement(self, *universe)
+
+    def copy(self):
+        """Return a new set with a shallow copy of s.
+
+        The copy shares this set's storage until either of them is
+        modified, so this is O(1).
+        """
+        s = self.__class__()
+        s._share(self)
+        return s
+
+    def add(self, x, y=None):
+        """Add an item (or a range of items) to the set.
+
+        Arguments:
+          ``x``: the first (or only) item to be added.
+          ``y``: one item past the range that should not be added.
+        """
+        if y is None:
+            y = x + 1
+        if self._shared is not None:
+            self._unshare()
+        s = self._set
+        l = len(s)
+        self._prefix = None
+
+        if l == 0:
+            s.append((x, y))
+            self._added(x, y)
+            return
+
+        (p, pi) = self._find(x - 1)
+        (q, qi) = self._find(y)
+        if p == l - 1 and not pi:
+            s.append((x, y))
+            self._added(x, y)
+            return
+        if not pi and not qi and p == q:
+            s.insert(p + 1, (x, y))
+            self._added(x, y)
+            return
+        if pi:
+            x = min(x, s[p][0])
+        if qi:
+            y = max(y, s[q][1])
+
+        if not pi:
+            p += 1
+        # intervals p…q are replaced by (x, y)
+        self._removed(p, q + 1)
+        self._added(x, y)
+        del s[p:q]
+        s[p] = (x, y)
+
+    def _added(self, x, y):
+        """Update the cached count and fingerprint: [x…y) is a new
+        interval."""
+        if self._count is not None:
+            self._count += y - x
+        if self._fp is not None:
+            self._fp = (self._fp + _fp(x, y)) % _FP_MOD
+
+    def _removed(self, i, j):
+        """Update the cached count and fingerprint: the intervals i…j-1
+        are going away."""
+        n = self._count
+        f = self._fp
+        if n is None and f is None:
+            return
+        for a, b in self._set[i:j]:
+            if n is not None:
+                n -= b - a
+            if f is not None:
+                f -= _fp(a, b)
+        self._count = n
+        if f is not None:
+            self._fp = f % _FP_MOD
+
+    def pop(self):
+        """Remove an arbitrary item.
+
+        We keep it simple and always remove the last one.
+        """
+        s = self._set
+        if not s:
+            raise KeyError()
+        x = s[-1][1] - 1
+        self.remove(x)
+        return x
+
+    def discard(self, x, y=None):
+        """
+        Like ``remove`` but does not raise an error if the item (or range)
+        is not present.
+        """
+        self.remove(x, y, error=False)
+
+    def present(self, x, y):
+        """Check if the range [x…y) is contained in the set."""
+        if not self._set:
+            return False
+        p, pi = self._find(x)
+        q, qi = self._find(y - 1)
+        return pi and qi and p == q
+
+    def absent(self, x, y):
+        """Check if no item in the range [x…y) is contained in the set."""
+        if not self._set:
+            return False
+        p, pi = self._find(x)
+        if pi:
+            return False
+        q, qi = self._find(y - 1)
+        if qi:
+            return False
+        return p == q
+
+    def remove(self, x, y=None, error=True):
+        """Remove an item (or a range of items) from the set.
+
+        Arguments:
+          ``x``: the first (or only) item to be removed.
+          ``y``: one item past the range that should not be removed.
+          ``error``: if set (the default), raise KeyError if no element has been removed.
+
+        """
+        if self._shared is not None:
+            self._unshare()
+        s = self._set
+        l = len(s)
+        if l == 0:
+            if error:
+                raise KeyError((x, y))
+            return
+        if y is None:
+            y = x + 1
+
+        (p, pi) = self._find(x - 1)
+        if p == l - 1 and not pi:
+            if error:
+                raise KeyError((x, y))
+            return
+
+        (q, qi) = self._find(y)
+        if not pi and not qi and p == q:
+            # This includes q<0
+            if error:
+                raise KeyError((x, y))
+            return
+        self._prefix = None
+        if pi and qi and p == q:
+            # Removing from inside a range: split it.
+            a, b = s[p]
+            self._removed(p, p + 1)
+            self._added(a, x)
+            self._added(y, b)
+            s.insert(p, (a, x))
+            s[p + 1] = (y, b)
+            return
+        if pi:
+            a, b = s[p]
+            self._removed(p, p + 1)
+            self._added(a, x)
+            s[p] = (a, x)
+            # the start is always kept because if it would be
+            # deleted, p is the previous index and pi is False
+        if qi:
+            a, b = s[q]
+            self._removed(q, q + 1)
+            self._added(y, b)
+            s[q] = (y, b)
+        else:  # don't keep the end
+            q += 1
+        self._removed(p + 1, q)
+        del s[p + 1:q]
+
+    def __contains__(self, x):
+        if not self._set:
+            return False
+        _, f = self._find(x)
+        return f
+
+    def __len__(self):
+        return len(self._set)
+
+    def _np_edges(self, np):
+        s = self._set
+        e = s.edges()
+        try:
+            return np.frombuffer(e, dtype=np.int64)
+        except TypeError:
+            return np.fromiter(e, dtype=np.int64, count=2 * len(s))
+
+    def contains_many(self, values):
+        """Check many values for membership at once.
+
+        Arguments:
+          ``values``: an array (or sequence) of integers.
+
+        Returns a NumPy array of booleans. Requires NumPy.
+        """
+        import numpy as np
+
+        v = np.asarray(values, dtype=np.int64)
+        k = np.searchsorted(self._np_edges(np), v, side="right")
+        return (k & 1).astype(bool)
+
+    def add_many(self, values):
+        """Add many single values at once.
+
+        The values are sorted and coalesced into runs, which are then
+        merged into the set in one pass. Requires NumPy.
+        """
+        import numpy as np
+
+        runs = _np_runs(np, np.unique(np.asarray(values, dtype=np.int64)))
+        self._replace(self._set.new_edges(_np_merge(np, self._np_edges(np), runs, _OR)))
+
+    def ingest(self, iter=None, buffer=1024, on_flush=None):
+        """Return a `RangeSetIngester` that adds single values to this set
+        in batches.
+
+        Arguments:
+          ``iter``: values to add right away; they are flushed before this
+            method returns.
+          ``buffer``: the number of values to collect before merging them.
+          ``on_flush``: a callable which is called with this set after
+            each merge.
+
+        Use the result as a context manager, which flushes when it exits.
+        """
+        ing = RangeSetIngester(self, buffer, on_flush)
+        if iter is not None:
+            ing.update(iter)
+            ing.flush()
+        return ing
+
+    def apply_delta(self, delta):
+        """Apply the changes from ``JournaledRangeSet.delta_since``.
+
+        Returns the version of the delta, which is the token to ask for
+        next time.
+        """
+        if delta.full:
+            self._replace(self._set.new(tuple(r) for r in delta.added))
+        else:
+            for x, y in delta.removed:
+                self.discard(x, y)
+            for x, y in delta.added:
+                self.add(x, y)
+        return delta.version
+
+    def _add_runs(self, runs):
+        """Add the sorted, coalesced intervals in the store ``runs``.
+
+        A few runs are added individually, which is cheap when they are
+        close to the end of the set; many runs are merged in one sweep.
+        """
+        if 8 * len(runs) < len(self._set):
+            for x, y in runs:
+                self.add(x, y)
+        else:
+            self |= runs
+
+    def discard_many(self, values):
+        """Remove many single values at once, if they are present.
+
+        Requires NumPy.
+        """
+        import numpy as np
+
+        runs = _np_runs(np, np.unique(np.asarray(values, dtype=np.int64)))
+        self._replace(self._set.new_edges(_np_merge(np, self._np_edges(np), runs, _SUB)))
+
+    def count(self):
+        """Count the total number of elemnts in the set.
+        In contrast, ``len()`` counts the number of distinct ranges.
+
+        The result is computed on the first call, then cached and kept
+        up-to-date by ``add`` and ``remove``, so this is O(1) unless the
+        set was replaced wholesale.
+        """
+        n = self._count
+        if n is None:
+            n = 0
+            for a, b in self._set:
+                n += b - a
+            self._count = n
+        return n
+
+    def fingerprint(self):
+        """Return a 61-bit integer that depends only on the content of
+        the set.
+
+        Equal sets have equal fingerprints, while different sets almost
+        certainly don't. The value is the same in every process, so it
+        may be used as a cache key or sent elsewhere for comparison.
+
+        Like ``count``, this is computed on the first call, then cached and
+        kept up-to-date by ``add`` and ``remove``.
+        """
+        f = self._fp
+        if f is None:
+            f = 0
+            for a, b in self._set:
+                f += _fp(a, b)
+            f %= _FP_MOD
+            self._fp = f
+        return f
+
+    def _prefixes(self):
+        """Return a list whose n-th entry is the number of elements in the
+        intervals before the n-th. Built on demand, dropped when the set
+        is modified."""
+        pf = self._prefix
+        if pf is None:
+            pf = [0]
+            n = 0
+            for a, b in self._set:
+                n += b - a
+                pf.append(n)
+            self._prefix = pf
+            self._count = n
+        return pf
+
+    def rank(self, x):
+        """Return the number of elements that are smaller than ``x``."""
+        if not self._set:
+            return 0
+        p, pi = self._find(x)
+        if p < 0:
+            return 0
+        pf = self._prefixes()
+        if pi:
+            return pf[p] + x - self._set[p][0]
+        return pf[p + 1]
+
+    def select(self, k):
+        """Return the ``k``-th smallest element (starting with zero).
+
+        Negative values count from the end. Raises ``IndexError`` if there
+        is no such element.
+        """
+        pf = self._prefixes()
+        if k < 0:
+            k += pf[-1]
+        if not 0 <= k < pf[-1]:
+            raise IndexError(k)
+        i = bisect_right(pf, k) - 1
+        return self._set[i][0] + k - pf[i]
+
+    def fragmentation(self):
+        """Return statistics about the layout of the set, as a dict:
+
+        * ``intervals``: the number of intervals.
+        * ``elements``: the number of elements.
+        * ``lengths``, ``gaps``: histograms of the lengths of the intervals
+          and of the holes between them. They map ``2**k`` to the number of
+          lengths ``l`` with ``2**k <= l < 2**(k+1)``.
+        * ``bytes``: the approximate memory used by the store.
+
+        This takes O(n).
+        """
+        lengths = {}
+        gaps = {}
+        prev = None
+        for a, b in self._set:
+            k = 1 << ((b - a).bit_length() - 1)
+            lengths[k] = lengths.get(k, 0) + 1
+            if prev is not None:
+                k = 1 << ((a - prev).bit_length() - 1)
+                gaps[k] = gaps.get(k, 0) + 1
+            prev = b
+        return dict(
+            intervals=len(self._set),
+            elements=self.count(),
+            lengths=dict(sorted(lengths.items())),
+            gaps=dict(sorted(gaps.items())),
+            bytes=self._set.nbytes(),
+        )
+
+    def isdisjoint(self, other):
+        """Return ``True`` if the set has no elements in common with other.
+
+        Sets are disjoint if and only if their intersection is the empty set.
+        """
+        a = iter(self)
+        b = iter(other)
+
+        try:
+            ax, ay = next(a)
+            bx, by = next(b)
+            while True:
+                if ax >= by:
+                    bx, by = next(b)
+                elif bx >= ay:
+                    ax, ay = next(a)
+                else:
+                    return False
+        except StopIteration:
+            return True
+
+    def issubset(self, other, proper=False):
+        """Check whether every element in the set is in other.
+
+        Args:
+          ``other``: The set this should be a subset of.
+          ``proper``: If set, return ``False`` if the sets are identical.
+        """
+        a = iter(self)
+        b = iter(other)
+        disjoint = False
+
+        try:
+            ax, ay = next(a)
+        except StopIteration:
+            try:
+                next(b)
+            except StopIteration:
+                return True
+            else:
+                return not proper
+        try:
+            bx, by = next(b)
+        except StopIteration:
+            return False
+
+        while True:
+            while ax >= by:
+                try:
+                    bx, by = next(b)
+                except StopIteration:
+                    return False
+            if proper and (ax != bx or ay != by):
+                disjoint = True
+
+            if ax < bx:
+                return False
+            if ay > by:
+                return False
+            try:
+                ax, ay = next(a)
+            except StopIteration:
+                return disjoint or not proper
+
+    def __lt__(self, other):
+        return self.issubset(other, True)
+
+    def __le__(self, other):
+        return self.issubset(other, False)
+
+    def issuperset(self, other, proper=False):
+        """Test if every element of the other set is in this one.
+
+        Args:
+          ``other``: The set this should be a subset of.
+          ``proper``: If set, return ``False`` if the sets are identical.
+        """
+        return other.issubset(self, proper=proper)
+
+    def __eq__(self, other):
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        if self._set is other._set:
+            return True
+        if len(self._set) != len(other._set):
+            return False
+        # only use the cached values: computing them is as slow as comparing
+        if self._count is not None and other._count is not None:
+            if self._count != other._count:
+                return False
+        if self._fp is not None and other._fp is not None:
+            if self._fp != other._fp:
+                return False
+        return self._set == other._set
+
+    __hash__ = None
+
+    def __gt__(self, other):
+        return other.issubset(self, True)
+
+    def __ge__(self, other):
+        return other.issubset(self, False)
+
+    def span(self):
+        """Returns the smallest RangeSet encapsulating all items in this set"""
+        s = self._set
+        r = self._new(s.new())
+        if s:
+            r._set.append((s[0][0], s[-1][1]))
+        return r
+
+    @staticmethod
+    def _intervals(other):
+        """Return the interval list of ``other``, which may be any iterable
+        that ``RangeSet`` accepts, or a store."""
+        if isinstance(other, IntervalList):
+            return other
+        if not isinstance(other, RangeSet):
+            other = RangeSet(other)
+        return other._set
+
+    def _new(self, data):
+        """Return a new set of our type, using the store ``data``."""
+        s = self.__class__()
+        s._replace(data)
+        return s
+
+    @classmethod
+    def at_least(cls, sets, n, store=None):
+        """Return a new set with the elements that are in at least ``n``
+        of the given sets.
+
+        All sets are merged in a single pass.
+        """
+        sets = [cls._intervals(o) for o in sets]
+        if n < 1:
+            raise ValueError("n must be positive")
+        s = cls(store=store)
+        s._replace(_merge_many(sets, n, s._set.new()))
+        return s
+
+    @classmethod
+    def union_all(cls, sets, store=None):
+        """Return a new set with the elements of all given sets."""
+        return cls.at_least(sets, 1, store=store)
+
+    @classmethod
+    def intersect_all(cls, sets, store=None):
+        """Return a new set with the elements common to all given sets.
+
+        There must be at least one set.
+        """
+        sets = [cls._intervals(o) for o in sets]
+        if not sets:
+            raise ValueError("No sets to intersect")
+        return cls.at_least(sets, len(sets), store=store)
+
+    def _merge_with(self, others, common=False):
+        """Return the union (or, if ``common`` is set, the intersection) of
+        this set and all ``others``, as a new store."""
+        stores = [self._set]
+        stores.extend(self._intervals(o) for o in others)
+        return _merge_many(stores, len(stores) if common else 1, self._set.new())
+
+    def update(self, *others):
+        """Update the set, adding elements from all others."""
+        if len(others) == 1:
+            self |= others[0]
+        elif others:
+            self._replace(self._merge_with(others))
+        return self
+
+    __iadd__ = update
+
+    def union(self, *others):
+        """Return a new set with elements from the set and all others."""
+        if not others:
+            return self.copy()
+        if len(others) == 1:
+            return self | others[0]
+        return self._new(self._merge_with(others))
+
+    __add__ = union
+
+    union_update = update
+
+    def __or__(self, other):
+        return self._new(_merge(self._set, self._intervals(other), _OR, self._set.new()))
+
+    def intersection(self, *others):
+        """Return a new set with elements common to the set and all others."""
+        if not others:
+            return self.copy()
+        if len(others) == 1:
+            return self & others[0]
+        return self._new(self._merge_with(others, common=True))
+
+    def intersection_update(self, *others):
+        """Update the set, keeping only elements found in it and all others."""
+        if len(others) == 1:
+            self &= others[0]
+        elif others:
+            self._replace(self._merge_with(others, common=True))
+        return self
+
+    def __and__(self, other):
+        return self._new(_merge(self._set, self._intervals(other), _AND, self._set.new()))
+
+    def __ior__(self, other):
+        self._replace(_merge(self._set, self._intervals(other), _OR, self._set.new()))
+        return self
+
+    def __iand__(self, other):
+        self._replace(_merge(self._set, self._intervals(other), _AND, self._set.new()))
+        return self
+
+    def difference(self, *others):
+        """Return a new set with elements in the set that are not in the others."""
+        if not others:
+            return self.copy()
+        if len(others) > 1:
+            others = (RangeSet.union_all(others),)
+        return self - others[0]
+
+    def difference_update(self, *others):
+        """Update the set, removing elements found in others."""
+        if len(others) > 1:
+            others = (RangeSet.union_all(others),)
+        for o in others:
+            self -= o
+        return self
+
+    def __sub__(self, other):
+        return self._new(_merge(self._set, self._intervals(other), _SUB, self._set.new()))
+
+    def __isub__(self, other):
+        self._replace(_merge(self._set, self._intervals(other), _SUB, self._set.new()))
+        return self
+
+    def __ixor__(self, other):
+        self._replace(_merge(self._set, self._intervals(other), _XOR, self._set.new()))
+        return self
+
+    def symmetric_difference(self, *others):
+        """Return a new set with elements in either this set or ``other`` but not both."""
+        data = self._set
+        for o in others:
+            data = _merge(data, self._intervals(o), _XOR, data.new())
+        if data is self._set:
+            return self.copy()
+        return self._new(data)
+
+    def symmetric_difference_update(self, *others):
+        """Update the set, keeping only elements found in either set, but not in both."""
+        for o in others:
+            self ^= o
+        return self
+
+    def __xor__(self, other):
+        return self._new(_merge(self._set, self._intervals(other), _XOR, self._set.new()))
+
+
+def _read_only(self, *a, **k):
+    raise TypeError("%s is read-only" % (self.__class__.__name__,))
+
+
+class FrozenRangeSet(RangeSet):
+    """An immutable RangeSet, which can be used as a dict key.
+
+    If created from a RangeSet, the frozen set shares that set's storage
+    until the RangeSet is modified. The hash is the set's fingerprint.
+
+    Set operations return new FrozenRangeSet objects; in-place operators
+    rebind their target, as with ``frozenset``.
+    """
+
+    __slots__ = ()
+
+    def __hash__(self):
+        return self.fingerprint()
+
+    def copy(self):
+        """Return the set itself, as it cannot change."""
+        return self
+
+    def freeze(self):
+        return self
+
+    add = remove = discard = pop = _read_only
+    add_many = discard_many = ingest = apply_delta = _read_only
+    update = union_update = _read_only
+    intersection_update = difference_update = symmetric_difference_update = _read_only
+
+    def __ior__(self, other):
+        return NotImplemented
+
+    __iand__ = __isub__ = __ixor__ = __iadd__ = __ior__
+
+
+class RangeSetIngester:
+    """Collects single values and adds them to a RangeSet in batches.
+
+    Each batch is sorted and collapsed into runs of consecutive values,
+    so a mostly-ascending stream costs one ``list.append`` per value plus
+    one ``add`` per run. Values are not visible in the set until they are
+    flushed, which happens when ``buffer`` values have been collected,
+    when ``flush`` is called, and when the ``with`` block exits.
+
+    See ``RangeSet.ingest``.
+    """
+
+    __slots__ = ("_rs", "_buf", "buffer", "on_flush")
+
+    def __init__(self, rs, buffer=1024, on_flush=None):
+        if buffer < 1:
+            raise ValueError("buffer must be positive")
+        self._rs = rs
+        self._buf = []
+        self.buffer = buffer
+        self.on_flush = on_flush
+
+    def __repr__(self):
+        return "%s(%r, pending=%d)" % (self.__class__.__name__, self._rs, len(self._buf))
+
+    def __len__(self):
+        """Return the number of values that have not been flushed yet."""
+        return len(self._buf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def add(self, x):
+        """Add the value ``x``."""
+        buf = self._buf
+        buf.append(x)
+        if len(buf) >= self.buffer:
+            self.flush()
+
+    def update(self, values):
+        """Add all values from the iterable ``values``."""
+        buf = self._buf
+        n = self.buffer
+        it = iter(values)
+        while True:
+            buf.extend(islice(it, n - len(buf)))
+            if len(buf) < n:
+                return
+            self.flush()
+
+    def flush(self):
+        """Add all collected values to the set."""
+        buf = self._buf
+        if not buf:
+            return
+        buf.sort()
+        runs = IntervalList()
+        it = iter(buf)
+        x = next(it)
+        y = x + 1
+        for v in it:
+            if v > y:
+                runs.append((x, y))
+                x = v
+                y = v + 1
+            elif v == y:
+                y += 1
+        runs.append((x, y))
+        buf.clear()
+
+        self._rs._add_runs(runs)
+        if self.on_flush is not None:
+            self.on_flush(self._rs)
+
+
+class RangeSetComplement:
+    """A view of the elements in the range [lo…hi) that are not part of
+    a RangeSet. Iterating yields ``(start, end)`` tuples.
+
+    See ``RangeSet.complement``.
+    """
+
+    __slots__ = ("_rs", "lo", "hi")
+
+    def __init__(self, rs, lo, hi):
+        self._rs = rs
+        self.lo = lo
+        self.hi = hi
+
+    def __repr__(self):
+        return "%s(%r, %r, %r)" % (self.__class__.__name__, self._rs, self.lo, self.hi)
+
+    def __contains__(self, x):
+        return self.lo <= x < self.hi and x not in self._rs
+
+    def __iter__(self):
+        return self._rs.gaps(self.lo, self.hi)
+
+    def count(self):
+        """Count the number of elements in the view."""
+        if self.hi <= self.lo:
+            return 0
+        rs = self._rs
+        return self.hi - self.lo - (rs.rank(self.hi) - rs.rank(self.lo))
+
+
+from .mapped import MappedRangeSet  # noqa: E402
+from .concurrent import ConcurrentRangeSet  # noqa: E402
+from .aio import AsyncRangeSet  # noqa: E402
+from .hybrid import HybridRangeSet  # noqa: E402
+from .codec import CodedRangeSet  # noqa: E402
+from .rangedict import RangeDict  # noqa: E402
+from .journal import JournaledRangeSet  # noqa: E402
+from .stats import InstrumentedRangeSet, RangeSetStats  # noqa: E402
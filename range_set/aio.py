@@ -0,0 +1,158 @@
+"""A RangeSet that asyncio tasks can wait on."""
+
+import asyncio
+from bisect import bisect_left, insort
+from heapq import heapify, heappop, heappush
+
+from . import RangeSet
+
+__all__ = ["AsyncRangeSet"]
+
+
+class AsyncRangeSet(RangeSet):
+    """A RangeSet with awaitable ``wait_present`` and ``wait_count``
+    methods.
+
+    A task waiting for a range is filed under the first value of that
+    range which is missing from the set. Adding a range therefore only
+    checks the waiters filed within it. Operations that replace the
+    whole set, like ``|=``, check all waiters.
+
+    Waiters are resolved by the code that modifies the set, so this must
+    happen in the event loop's thread. Cancelling a waiting task removes
+    its waiter.
+    """
+
+    __slots__ = ("_waiters", "_keys", "_filed", "_counters", "_seq", "_dead")
+
+    def __init__(self, iter=None, store=None):
+        self._init_waiters()
+        super().__init__(iter, store=store)
+
+    def _init_waiters(self):
+        self._waiters = {}  # first missing value => {future: (x, y)}
+        self._keys = []  # sorted keys of _waiters
+        self._filed = {}  # future => its key in _waiters
+        self._counters = []  # heap of (n, seq, future)
+        self._seq = 0
+        self._dead = 0  # cancelled futures in _counters, at most
+
+    def __setstate__(self, state):
+        self._init_waiters()
+        super().__setstate__(state)
+
+    def _missing(self, x, y):
+        """Return the first value in [x…y) that is not in the set, or
+        ``None`` if there is none."""
+        s = self._set
+        if not s:
+            return x
+        p, pi = self._find(x)
+        if not pi:
+            return x
+        e = s[p][1]
+        return None if e >= y else e
+
+    def _file(self, fut, m, x, y):
+        w = self._waiters.get(m)
+        if w is None:
+            w = self._waiters[m] = {}
+            insort(self._keys, m)
+        w[fut] = (x, y)
+        self._filed[fut] = m
+
+    def _unfile(self, m):
+        del self._waiters[m]
+        del self._keys[bisect_left(self._keys, m)]
+
+    async def wait_present(self, x, y=None):
+        """Wait until the range [x…y) is contained in the set.
+
+        Arguments:
+          ``x``: the first (or only) item to wait for.
+          ``y``: one item past the range that is waited for.
+        """
+        if y is None:
+            y = x + 1
+        if x >= y:
+            return
+        m = self._missing(x, y)
+        if m is None:
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._file(fut, m, x, y)
+
+        def done(fut):
+            if fut.cancelled():
+                m = self._filed.pop(fut, None)
+                if m is not None:
+                    w = self._waiters[m]
+                    del w[fut]
+                    if not w:
+                        self._unfile(m)
+
+        fut.add_done_callback(done)
+        await fut
+
+    async def wait_count(self, n):
+        """Wait until the set contains at least ``n`` elements.
+
+        Returns the number of elements at that time.
+        """
+        c = self.count()
+        if c >= n:
+            return c
+        fut = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heappush(self._counters, (n, self._seq, fut))
+
+        def done(fut):
+            if fut.cancelled():
+                # drop cancelled futures once they are half of the heap
+                self._dead += 1
+                if 2 * self._dead >= len(self._counters):
+                    self._counters = [e for e in self._counters if not e[2].done()]
+                    heapify(self._counters)
+                    self._dead = 0
+
+        fut.add_done_callback(done)
+        return await fut
+
+    def _wake(self, lo=None, hi=None):
+        """Check the waiters filed within [lo…hi); ``None`` is unbounded."""
+        keys = self._keys
+        i = 0 if lo is None else bisect_left(keys, lo)
+        j = len(keys) if hi is None else bisect_left(keys, hi)
+        for m in keys[i:j]:
+            w = self._waiters[m]
+            self._unfile(m)
+            for fut, (x, y) in w.items():
+                if fut.done():
+                    del self._filed[fut]
+                    continue
+                mm = self._missing(x, y)
+                if mm is None:
+                    del self._filed[fut]
+                    fut.set_result(None)
+                else:
+                    self._file(fut, mm, x, y)
+
+        heap = self._counters
+        if heap and heap[0][0] <= self.count():
+            c = self.count()
+            while heap and heap[0][0] <= c:
+                fut = heappop(heap)[2]
+                if not fut.done():
+                    fut.set_result(c)
+
+    def add(self, x, y=None):
+        super().add(x, y)
+        if self._keys or self._counters:
+            self._wake(x, x + 1 if y is None else y)
+
+    add.__doc__ = RangeSet.add.__doc__
+
+    def _replace(self, data):
+        super()._replace(data)
+        if self._keys or self._counters:
+            self._wake()
@@ -0,0 +1,314 @@
+"""RangeSets of values that map to integers, like IP addresses or dates.
+
+A `Codec` converts such values to integers and back. `CodedRangeSet`
+stores the integers in a plain RangeSet, so searching compares ints
+instead of calling rich comparison methods, and converts values only
+when they pass its API.
+
+The end of a range is the value after the range's last element. If
+there is no such value, as for ``255.255.255.255``, the end is
+returned as ``None``, and an end of ``None`` is accepted as the end of
+the domain.
+"""
+
+from datetime import date, datetime, timedelta
+from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
+
+from . import RangeSet
+from .store import IntervalArray, IntervalList
+
+__all__ = ["Codec", "CodedRangeSet", "IPV4", "IPV6", "DATE", "DATETIME", "datetime_codec"]
+
+# The default end of a range: the range is a single value
+_ONE = object()
+
+
+class Codec:
+    """Converts values to integers and back.
+
+    Arguments:
+      ``name``: for ``repr``.
+      ``encode``, ``decode``: the conversion functions. ``decode`` may
+        raise ``ValueError`` or ``OverflowError`` for integers that don't
+        correspond to a value.
+      ``bits``: the number of bits required to store the integers. Sets
+        whose values fit in 63 bits use an `IntervalArray` by default.
+      ``span``: optional; a function that returns a ``(start, end)``
+        tuple of integers for values that denote a range, like IP
+        networks, and ``None`` otherwise.
+      ``limit``: the integer after the largest value, which an end of
+        ``None`` is encoded as. Defaults to ``2**bits``.
+    """
+
+    __slots__ = ("name", "encode", "decode", "bits", "span", "limit")
+
+    def __init__(self, name, encode, decode, bits=None, span=None, limit=None):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+        self.bits = bits
+        self.span = span
+        if limit is None and bits is not None:
+            limit = 1 << bits
+        self.limit = limit
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.name)
+
+    def encode_end(self, v):
+        """Encode the end of a range; ``None`` is the end of the domain."""
+        if v is not None:
+            return self.encode(v)
+        if self.limit is None:
+            raise ValueError("%s has no largest value" % (self.name,))
+        return self.limit
+
+    def decode_end(self, n):
+        """Decode the end of a range, returning ``None`` if ``n`` is past
+        the largest value."""
+        if n == self.limit:
+            return None
+        try:
+            return self.decode(n)
+        except (ValueError, OverflowError):
+            return None
+
+
+def _ip_codec(name, addr, net, bits):
+    def encode(v):
+        return int(v) if isinstance(v, addr) else int(addr(v))
+
+    def span(v):
+        if isinstance(v, net):
+            return (int(v.network_address), int(v.broadcast_address) + 1)
+        return None
+
+    return Codec(name, encode, addr, bits, span)
+
+
+IPV4 = _ip_codec("IPV4", IPv4Address, IPv4Network, 32)
+IPV6 = _ip_codec("IPV6", IPv6Address, IPv6Network, 128)
+
+DATE = Codec("DATE", date.toordinal, date.fromordinal, 22, limit=date.max.toordinal() + 1)
+
+
+def datetime_codec(resolution=timedelta(seconds=1), epoch=datetime(1970, 1, 1)):
+    """Return a codec for datetimes with the given resolution.
+
+    Datetimes are rounded down to a multiple of ``resolution`` after
+    ``epoch``. Use an aware ``epoch`` for aware datetimes.
+    """
+
+    def encode(v):
+        return (v - epoch) // resolution
+
+    def decode(n):
+        return epoch + n * resolution
+
+    limit = encode(datetime.max.replace(tzinfo=epoch.tzinfo)) + 1
+    return Codec("datetime/%s" % (resolution,), encode, decode, 63, limit=limit)
+
+
+DATETIME = datetime_codec()
+
+
+class CodedRangeSet:
+    """A set of values that a `Codec` maps to integers.
+
+    This supports most of the `RangeSet` API. Ranges are ``(start,
+    end)`` tuples of values; the end is not part of the range. Where a
+    codec supports it, a single value that denotes a range (like an IP
+    network) may be used instead.
+
+    ``raw`` is the underlying RangeSet of integers.
+    """
+
+    __slots__ = ("codec", "raw")
+
+    def __init__(self, codec, iter=None, store=None):
+        self.codec = codec
+        if store is None:
+            store = IntervalArray if codec.bits is not None and codec.bits < 64 else IntervalList
+        self.raw = RangeSet(None if iter is None else map(self._item, iter), store=store)
+
+    def _item(self, v):
+        if isinstance(v, tuple):
+            return self._range(*v)
+        return self._range(v)
+
+    def _range(self, x, y=_ONE):
+        """Return the integer range for ``(x, y)``, or just ``x``."""
+        c = self.codec
+        if y is _ONE:
+            if c.span is not None:
+                r = c.span(x)
+                if r is not None:
+                    return r
+            x = c.encode(x)
+            return (x, x + 1)
+        return (c.encode(x), c.encode_end(y))
+
+    def _new(self, raw):
+        s = self.__class__.__new__(self.__class__)
+        s.codec = self.codec
+        s.raw = raw
+        return s
+
+    def _raw(self, other):
+        """Return ``other`` as a RangeSet of integers."""
+        if isinstance(other, CodedRangeSet):
+            if other.codec is not self.codec:
+                raise ValueError("Sets use different codecs")
+            return other.raw
+        return CodedRangeSet(self.codec, other).raw
+
+    def _decode(self, it):
+        dec = self.codec.decode
+        end = self.codec.decode_end
+        for a, b in it:
+            yield (dec(a), end(b))
+
+    def __repr__(self):
+        return "%s(%s, %r)" % (self.__class__.__name__, self.codec.name, list(self))
+
+    def __iter__(self):
+        return self._decode(self.raw)
+
+    def __reversed__(self):
+        return self._decode(reversed(self.raw))
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __contains__(self, x):
+        x, y = self._range(x)
+        if y == x + 1:
+            return x in self.raw
+        return self.raw.present(x, y)
+
+    def __eq__(self, other):
+        if not isinstance(other, CodedRangeSet):
+            return NotImplemented
+        return self.codec is other.codec and self.raw == other.raw
+
+    __hash__ = None
+
+    def copy(self):
+        """Return a shallow copy of this set."""
+        return self._new(self.raw.copy())
+
+    def add(self, x, y=_ONE):
+        """Add an item (or a range of items) to the set. An end of
+        ``None`` is the end of the domain."""
+        self.raw.add(*self._range(x, y))
+
+    def remove(self, x, y=_ONE, error=True):
+        """Remove an item (or a range of items) from the set.
+
+        If ``error`` is set (the default), raise KeyError if no element
+        has been removed.
+        """
+        a, b = self._range(x, y)
+        self.raw.remove(a, b, error=error)
+
+    def discard(self, x, y=_ONE):
+        """Like ``remove`` but does not raise an error if the item (or
+        range) is not present."""
+        self.remove(x, y, error=False)
+
+    def pop(self):
+        """Remove and return the largest item."""
+        return self.codec.decode(self.raw.pop())
+
+    def present(self, x, y=_ONE):
+        """Check if the range [x…y) is contained in the set."""
+        return self.raw.present(*self._range(x, y))
+
+    def absent(self, x, y=_ONE):
+        """Check if no item in the range [x…y) is contained in the set."""
+        return self.raw.absent(*self._range(x, y))
+
+    def _bounds(self, x, y):
+        enc = self.codec.encode
+        return (None if x is None else enc(x)), (None if y is None else enc(y))
+
+    def irange(self, x=None, y=None, clip=True, reverse=False):
+        """Iterate over the ranges that overlap [x…y), like
+        `RangeSet.irange`."""
+        x, y = self._bounds(x, y)
+        return self._decode(self.raw.irange(x, y, clip=clip, reverse=reverse))
+
+    def overlapping(self, x, y):
+        """Iterate over the ranges that overlap [x…y), without clipping
+        them."""
+        return self.irange(x, y, clip=False)
+
+    def gaps(self, lo=None, hi=None):
+        """Iterate over the holes in the set, like `RangeSet.gaps`."""
+        return self._decode(self.raw.gaps(*self._bounds(lo, hi)))
+
+    def count(self):
+        """Count the total number of elements in the set."""
+        return self.raw.count()
+
+    def rank(self, x):
+        """Return the number of elements that are smaller than ``x``."""
+        return self.raw.rank(self.codec.encode(x))
+
+    def select(self, k):
+        """Return the ``k``-th smallest element (starting with zero)."""
+        return self.codec.decode(self.raw.select(k))
+
+    def span(self):
+        """Return the smallest set that contains all items of this set,
+        as a single range."""
+        return self._new(self.raw.span())
+
+    def isdisjoint(self, other):
+        """Return ``True`` if the set has no elements in common with other."""
+        return self.raw.isdisjoint(self._raw(other))
+
+    def issubset(self, other, proper=False):
+        """Check whether every element in the set is in other."""
+        return self.raw.issubset(self._raw(other), proper=proper)
+
+    def issuperset(self, other, proper=False):
+        """Test if every element of the other set is in this one."""
+        return self._raw(other).issubset(self.raw, proper=proper)
+
+    def __or__(self, other):
+        return self._new(self.raw | self._raw(other))
+
+    def __and__(self, other):
+        return self._new(self.raw & self._raw(other))
+
+    def __sub__(self, other):
+        return self._new(self.raw - self._raw(other))
+
+    def __xor__(self, other):
+        return self._new(self.raw ^ self._raw(other))
+
+    def __ior__(self, other):
+        self.raw |= self._raw(other)
+        return self
+
+    def __iand__(self, other):
+        self.raw &= self._raw(other)
+        return self
+
+    def __isub__(self, other):
+        self.raw -= self._raw(other)
+        return self
+
+    def __ixor__(self, other):
+        self.raw ^= self._raw(other)
+        return self
+
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+    symmetric_difference = __xor__
+    update = __ior__
+    intersection_update = __iand__
+    difference_update = __isub__
+    symmetric_difference_update = __ixor__
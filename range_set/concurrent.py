@@ -0,0 +1,175 @@
+"""A RangeSet that may be shared between threads."""
+
+import threading
+from contextlib import contextmanager
+
+from . import FrozenRangeSet, RangeSet
+
+__all__ = ["ConcurrentRangeSet"]
+
+
+class ConcurrentRangeSet:
+    """A RangeSet for one or more writer threads and any number of
+    readers.
+
+    The current content is an immutable `FrozenRangeSet` snapshot.
+    Readers use whichever snapshot is current when they start, without
+    locking, so they never see a partial update. Writers serialize on a
+    lock, apply their change to a copy of the snapshot and then publish
+    the result, which costs O(n) per write.
+
+    Use ``batch`` to apply many changes with a single publish.
+
+    Read-only methods and set operations are forwarded to the current
+    snapshot and therefore return `FrozenRangeSet` objects.
+    """
+
+    __slots__ = ("_snap", "_lock", "_pending")
+
+    def __init__(self, iter=None, store=None):
+        self._snap = FrozenRangeSet(iter, store=store)
+        self._lock = threading.RLock()
+        self._pending = None
+
+    def snapshot(self):
+        """Return the current content, as a `FrozenRangeSet`."""
+        return self._snap
+
+    freeze = snapshot
+
+    def copy(self):
+        """Return the current content, as a new RangeSet."""
+        return self._thaw()
+
+    def _thaw(self):
+        s = RangeSet()
+        s._share(self._snap)
+        return s
+
+    def _write(self, name, *a, **k):
+        with self._lock:
+            s = self._pending
+            if s is not None:
+                return getattr(s, name)(*a, **k)
+            s = self._thaw()
+            res = getattr(s, name)(*a, **k)
+            self._snap = FrozenRangeSet(s)
+            return res
+
+    @contextmanager
+    def batch(self):
+        """A context manager that collects all changes made within it
+        and publishes them at once when it exits.
+
+        Other writers are blocked while the batch is active. If the block
+        raises an exception, its changes are discarded.
+        """
+        with self._lock:
+            if self._pending is not None:
+                yield self
+                return
+            self._pending = self._thaw()
+            try:
+                yield self
+            except BaseException:
+                self._pending = None
+                raise
+            s, self._pending = self._pending, None
+            self._snap = FrozenRangeSet(s)
+
+    def add(self, x, y=None):
+        """Add an item (or a range of items) to the set."""
+        self._write("add", x, y)
+
+    def remove(self, x, y=None, error=True):
+        """Remove an item (or a range of items) from the set."""
+        self._write("remove", x, y, error=error)
+
+    def discard(self, x, y=None):
+        """Like ``remove`` but does not raise an error if the item (or
+        range) is not present."""
+        self._write("discard", x, y)
+
+    def pop(self):
+        """Remove and return an arbitrary item."""
+        return self._write("pop")
+
+    def __ior__(self, other):
+        self._write("__ior__", other)
+        return self
+
+    def __iand__(self, other):
+        self._write("__iand__", other)
+        return self
+
+    def __isub__(self, other):
+        self._write("__isub__", other)
+        return self
+
+    def __ixor__(self, other):
+        self._write("__ixor__", other)
+        return self
+
+    def ingest(self, iter=None, buffer=1024, on_flush=None):
+        """Return a `RangeSetIngester` that adds single values to this set
+        in batches. Each batch is published at once."""
+        return RangeSet.ingest(self, iter, buffer, on_flush)
+
+    def _add_runs(self, runs):
+        self._write("_add_runs", runs)
+
+    def apply_delta(self, delta):
+        """Apply the changes from ``JournaledRangeSet.delta_since``."""
+        return self._write("apply_delta", delta)
+
+    def update(self, *others):
+        """Update the set, adding elements from all others."""
+        self._write("update", *others)
+        return self
+
+    __iadd__ = union_update = update
+
+    def intersection_update(self, *others):
+        """Update the set, keeping only elements found in it and all others."""
+        self._write("intersection_update", *others)
+        return self
+
+    def difference_update(self, *others):
+        """Update the set, removing elements found in others."""
+        self._write("difference_update", *others)
+        return self
+
+    def symmetric_difference_update(self, *others):
+        """Update the set, keeping only elements found in either set, but not in both."""
+        self._write("symmetric_difference_update", *others)
+        return self
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self._snap))
+
+    def __eq__(self, other):
+        if isinstance(other, ConcurrentRangeSet):
+            other = other._snap
+        return self._snap == other
+
+    __hash__ = None
+
+
+def _reader(name):
+    def reader(self, *a, **k):
+        return getattr(self._snap, name)(*a, **k)
+
+    reader.__name__ = name
+    reader.__doc__ = getattr(RangeSet, name).__doc__
+    return reader
+
+
+for _name in (
+    "__contains__ __len__ __iter__ __reversed__ __lt__ __le__ __gt__ __ge__ "
+    "__or__ __and__ __sub__ __xor__ __add__ "
+    "present absent count fingerprint fragmentation rank select irange overlapping gaps span "
+    "isdisjoint issubset issuperset union intersection difference symmetric_difference "
+    "contains_many to_bytes to_file"
+).split():
+    setattr(ConcurrentRangeSet, _name, _reader(_name))
+del _name
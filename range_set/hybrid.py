@@ -0,0 +1,571 @@
+"""A set of integers that adapts its representation to the density of
+its content.
+
+The integers are split into chunks of ``2**16`` values. Each chunk is
+stored in one of three containers, whichever is smallest:
+
+* runs: the chunk's intervals, in a `RangeSet` with an `IntervalArray`
+  store (16 bytes per interval);
+* array: the chunk's values, as an ``array("H")`` (2 bytes per value);
+* bitmap: a Python integer with one bit per value (8 KiB).
+
+Adding and removing values converts a container when it clearly is the
+wrong kind: arrays with more than 4096 values become bitmaps and vice
+versa, runs become an array or a bitmap if either is smaller, and full
+chunks become runs. Set operations, and ``optimize``, pick the best kind
+for every chunk of their result.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, insort
+from itertools import chain
+from sys import getsizeof
+
+from . import RangeSet
+from .store import IntervalArray
+
+__all__ = ["HybridRangeSet"]
+
+BITS = 16
+CHUNK = 1 << BITS
+MASK = CHUNK - 1
+
+# Container sizes, in bytes
+RUN_BYTES = 16
+VALUE_BYTES = 2
+BITMAP_BYTES = CHUNK // 8
+
+ARRAY_MAX = BITMAP_BYTES // VALUE_BYTES
+
+_ONES = re.compile("1+")
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+
+    def _popcount(b):
+        return bin(b).count("1")
+
+
+def _mask(lo, hi):
+    return ((1 << (hi - lo)) - 1) << lo
+
+
+def _int_runs(b):
+    """Return the runs of set bits in ``b`` as ``(lo, hi)`` tuples."""
+    return [m.span() for m in _ONES.finditer(bin(b)[:1:-1])]
+
+
+def _runs_int(runs):
+    """Return a bitmap of the ``(lo, hi)`` tuples in ``runs``."""
+    parts = []
+    prev = 0
+    for x, y in runs:
+        parts.append("0" * (x - prev))
+        parts.append("1" * (y - x))
+        prev = y
+    return int("".join(parts)[::-1] or "0", 2)
+
+
+def _container(runs, b=None):
+    """Return the smallest container for the sorted, coalesced ``(lo,
+    hi)`` tuples in ``runs``. ``b`` is their bitmap, if known."""
+    n = 0
+    for x, y in runs:
+        n += y - x
+    size = RUN_BYTES * len(runs)
+    if size <= VALUE_BYTES * n and size <= BITMAP_BYTES:
+        return _Runs(RangeSet.from_sorted(runs, store=IntervalArray))
+    if n <= ARRAY_MAX:
+        return _Array(array("H", chain.from_iterable(range(x, y) for x, y in runs)))
+    return _Bitmap(_runs_int(runs) if b is None else b, n)
+
+
+def _best(b):
+    """Return the smallest container for the bitmap ``b``, or ``None``
+    if it is empty."""
+    if not b:
+        return None
+    return _container(_int_runs(b), b)
+
+
+class _Runs:
+    """A container that stores intervals."""
+
+    __slots__ = ("rs",)
+
+    kind = "run"
+
+    def __init__(self, rs=None):
+        self.rs = RangeSet(store=IntervalArray) if rs is None else rs
+
+    def __contains__(self, v):
+        return v in self.rs
+
+    def count(self):
+        return self.rs.count()
+
+    def runs(self):
+        return iter(self.rs)
+
+    def present(self, lo, hi):
+        return self.rs.present(lo, hi)
+
+    def copy(self):
+        return _Runs(self.rs.copy())
+
+    def to_int(self):
+        return _runs_int(self.rs)
+
+    def nbytes(self):
+        return getsizeof(self) + self.rs._set.nbytes()
+
+    def add(self, lo, hi):
+        n = self.rs.count()
+        self.rs.add(lo, hi)
+        return self._fix(), self.rs.count() - n
+
+    def remove(self, lo, hi):
+        n = self.rs.count()
+        self.rs.discard(lo, hi)
+        return self._fix(), n - self.rs.count()
+
+    def _fix(self):
+        n = self.rs.count()
+        if not n:
+            return None
+        size = RUN_BYTES * len(self.rs)
+        if size > VALUE_BYTES * n or size > BITMAP_BYTES:
+            return _best(self.to_int())
+        return self
+
+
+class _Array:
+    """A container that stores a sorted array of values."""
+
+    __slots__ = ("a",)
+
+    kind = "array"
+
+    def __init__(self, a=None):
+        self.a = array("H") if a is None else a
+
+    def __contains__(self, v):
+        a = self.a
+        i = bisect_left(a, v)
+        return i < len(a) and a[i] == v
+
+    def count(self):
+        return len(self.a)
+
+    def runs(self):
+        it = iter(self.a)
+        for x in it:
+            y = x + 1
+            for v in it:
+                if v != y:
+                    yield (x, y)
+                    x = v
+                y = v + 1
+            yield (x, y)
+
+    def present(self, lo, hi):
+        a = self.a
+        return bisect_left(a, hi) - bisect_left(a, lo) == hi - lo
+
+    def copy(self):
+        return _Array(self.a[:])
+
+    def to_int(self):
+        buf = bytearray(BITMAP_BYTES)
+        for v in self.a:
+            buf[v >> 3] |= 1 << (v & 7)
+        return int.from_bytes(buf, "little")
+
+    def nbytes(self):
+        return getsizeof(self) + getsizeof(self.a)
+
+    def add(self, lo, hi):
+        a = self.a
+        i = bisect_left(a, lo)
+        j = bisect_left(a, hi)
+        d = hi - lo - (j - i)
+        if len(a) + d > ARRAY_MAX:
+            c = _Bitmap(self.to_int(), len(a))
+            return c.add(lo, hi)
+        a[i:j] = array("H", range(lo, hi))
+        return self, d
+
+    def remove(self, lo, hi):
+        a = self.a
+        i = bisect_left(a, lo)
+        j = bisect_left(a, hi)
+        del a[i:j]
+        return (self if a else None), j - i
+
+
+class _Bitmap:
+    """A container that stores one bit per value."""
+
+    __slots__ = ("b", "n")
+
+    kind = "bitmap"
+
+    def __init__(self, b=0, n=None):
+        self.b = b
+        self.n = _popcount(b) if n is None else n
+
+    def __contains__(self, v):
+        return (self.b >> v) & 1
+
+    def count(self):
+        return self.n
+
+    def runs(self):
+        return iter(_int_runs(self.b))
+
+    def present(self, lo, hi):
+        m = _mask(lo, hi)
+        return self.b & m == m
+
+    def copy(self):
+        return _Bitmap(self.b, self.n)
+
+    def to_int(self):
+        return self.b
+
+    def nbytes(self):
+        return getsizeof(self) + getsizeof(self.b)
+
+    def add(self, lo, hi):
+        m = _mask(lo, hi)
+        d = _popcount(m & ~self.b)
+        self.b |= m
+        self.n += d
+        if self.n == CHUNK:
+            return _Runs(RangeSet([(0, CHUNK)], store=IntervalArray)), d
+        return self, d
+
+    def remove(self, lo, hi):
+        old = self.b & _mask(lo, hi)
+        d = _popcount(old)
+        self.b ^= old
+        self.n -= d
+        if self.n <= ARRAY_MAX:
+            return _best(self.b), d
+        return self, d
+
+
+# Set operations on bitmaps, by the name of the corresponding operator
+_INT_OPS = {
+    "__or__": int.__or__,
+    "__and__": int.__and__,
+    "__sub__": lambda a, b: a & ~b,
+    "__xor__": int.__xor__,
+}
+
+
+def _combine(ca, cb, op):
+    """Apply the operator ``op`` to two containers, returning a new
+    container or ``None``.
+
+    Two run containers are combined with RangeSet's operators; all other
+    pairs are converted to bitmaps.
+    """
+    if isinstance(ca, _Runs) and isinstance(cb, _Runs):
+        return _Runs(getattr(ca.rs, op)(cb.rs))._fix()
+    return _best(_INT_OPS[op](ca.to_int(), cb.to_int()))
+
+
+class HybridRangeSet:
+    """A set of integers that stores each chunk of ``2**16`` values as
+    runs, an array or a bitmap, depending on its density (see
+    `range_set.hybrid`).
+
+    The API is a subset of `RangeSet`'s. Iterating yields ``(start,
+    end)`` tuples and ``len()`` is the number of intervals.
+    """
+
+    __slots__ = ("_keys", "_chunks", "_count")
+
+    def __init__(self, iter=None):
+        self._keys = []
+        self._chunks = {}
+        self._count = 0
+        if iter is not None:
+            if not isinstance(iter, RangeSet):
+                iter = RangeSet(iter)
+            key = None
+            runs = []
+            for x, y in iter:
+                for k, lo, hi in self._spans(x, y):
+                    if k != key:
+                        self._append(key, runs)
+                        key = k
+                        runs = []
+                    runs.append((lo, hi))
+            self._append(key, runs)
+
+    def _append(self, k, runs):
+        """Add a chunk after all existing ones."""
+        if runs:
+            c = _container(runs)
+            self._keys.append(k)
+            self._chunks[k] = c
+            self._count += c.count()
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self))
+
+    def __getstate__(self):
+        return list(self)
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    def _spans(self, x, y):
+        """Yield ``(key, lo, hi)`` for the chunks overlapping [x…y)."""
+        k1 = x >> BITS
+        k2 = (y - 1) >> BITS
+        for k in range(k1, k2 + 1):
+            base = k << BITS
+            lo = x - base if k == k1 else 0
+            hi = y - base if k == k2 else CHUNK
+            yield k, lo, hi
+
+    def _set_chunk(self, k, c):
+        if c is None:
+            del self._chunks[k]
+            del self._keys[bisect_left(self._keys, k)]
+        else:
+            self._chunks[k] = c
+
+    def add(self, x, y=None):
+        """Add an item (or a range of items) to the set.
+
+        Arguments:
+          ``x``: the first (or only) item to be added.
+          ``y``: one item past the range that should not be added.
+        """
+        if y is None:
+            y = x + 1
+        if x >= y:
+            return
+        chunks = self._chunks
+        for k, lo, hi in self._spans(x, y):
+            c = chunks.get(k)
+            if c is None:
+                insort(self._keys, k)
+                c = _Runs() if hi - lo > 1 else _Array()
+            chunks[k], d = c.add(lo, hi)
+            self._count += d
+
+    def remove(self, x, y=None, error=True):
+        """Remove an item (or a range of items) from the set.
+
+        Arguments:
+          ``x``: the first (or only) item to be removed.
+          ``y``: one item past the range that should not be removed.
+          ``error``: if set (the default), raise KeyError if no element
+            has been removed.
+        """
+        if y is None:
+            y = x + 1
+        n = 0
+        if x < y:
+            chunks = self._chunks
+            for k, lo, hi in self._spans(x, y):
+                c = chunks.get(k)
+                if c is not None:
+                    c, d = c.remove(lo, hi)
+                    self._set_chunk(k, c)
+                    n += d
+        self._count -= n
+        if error and not n:
+            raise KeyError((x, y))
+
+    def discard(self, x, y=None):
+        """Like ``remove`` but does not raise an error if the item (or
+        range) is not present."""
+        self.remove(x, y, error=False)
+
+    def pop(self):
+        """Remove and return the largest item."""
+        if not self._keys:
+            raise KeyError()
+        k = self._keys[-1]
+        y = max(y for _, y in self._chunks[k].runs())
+        x = (k << BITS) + y - 1
+        self.remove(x)
+        return x
+
+    def __contains__(self, x):
+        c = self._chunks.get(x >> BITS)
+        return c is not None and (x & MASK) in c
+
+    def present(self, x, y):
+        """Check if the range [x…y) is contained in the set."""
+        if x >= y:
+            return False
+        for k, lo, hi in self._spans(x, y):
+            c = self._chunks.get(k)
+            if c is None or not c.present(lo, hi):
+                return False
+        return True
+
+    def count(self):
+        """Count the total number of elements in the set."""
+        return self._count
+
+    def __len__(self):
+        n = 0
+        for _ in self:
+            n += 1
+        return n
+
+    def __bool__(self):
+        return bool(self._keys)
+
+    def __iter__(self):
+        start = end = None
+        chunks = self._chunks
+        for k in self._keys:
+            base = k << BITS
+            for lo, hi in chunks[k].runs():
+                lo += base
+                if lo == end:
+                    end = hi + base
+                    continue
+                if start is not None:
+                    yield (start, end)
+                start = lo
+                end = hi + base
+        if start is not None:
+            yield (start, end)
+
+    def __eq__(self, other):
+        if isinstance(other, HybridRangeSet):
+            if self._count != other._count or self._keys != other._keys:
+                return False
+        elif isinstance(other, RangeSet):
+            if self._count != other.count():
+                return False
+        else:
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def copy(self):
+        """Return a copy of this set."""
+        s = self.__class__()
+        s._keys = self._keys[:]
+        s._chunks = {k: c.copy() for k, c in self._chunks.items()}
+        s._count = self._count
+        return s
+
+    def to_rangeset(self, store=None):
+        """Return the content of this set as a `RangeSet`."""
+        return RangeSet.from_sorted(self, store=store)
+
+    def optimize(self):
+        """Convert every chunk to its smallest representation."""
+        for k, c in self._chunks.items():
+            self._chunks[k] = _best(c.to_int())
+
+    def containers(self):
+        """Return the number of chunks that use each kind of container,
+        as a dict."""
+        res = {"run": 0, "array": 0, "bitmap": 0}
+        for c in self._chunks.values():
+            res[c.kind] += 1
+        return res
+
+    def nbytes(self):
+        """Return the approximate memory used by this set."""
+        n = getsizeof(self) + getsizeof(self._keys) + getsizeof(self._chunks)
+        for c in self._chunks.values():
+            n += c.nbytes()
+        return n
+
+    def _apply(self, other, op):
+        """Combine this set with ``other``, chunk by chunk.
+
+        ``op`` is the name of the operator method, like ``"__or__"``.
+        """
+        if not isinstance(other, HybridRangeSet):
+            other = HybridRangeSet(other)
+        ca = self._chunks
+        cb = other._chunks
+        if op == "__and__":
+            keys = [k for k in self._keys if k in cb]
+        elif op == "__sub__":
+            keys = self._keys
+        else:
+            keys = sorted(set(self._keys).union(other._keys))
+
+        res = self.__class__()
+        for k in keys:
+            a = ca.get(k)
+            b = cb.get(k)
+            if b is None:
+                c = a.copy()
+            elif a is None:
+                c = b.copy()
+            else:
+                c = _combine(a, b, op)
+                if c is None:
+                    continue
+            res._keys.append(k)
+            res._chunks[k] = c
+            res._count += c.count()
+        return res
+
+    def _update(self, res):
+        self._keys = res._keys
+        self._chunks = res._chunks
+        self._count = res._count
+        return self
+
+    def __or__(self, other):
+        return self._apply(other, "__or__")
+
+    def __and__(self, other):
+        return self._apply(other, "__and__")
+
+    def __sub__(self, other):
+        return self._apply(other, "__sub__")
+
+    def __xor__(self, other):
+        return self._apply(other, "__xor__")
+
+    def __ior__(self, other):
+        return self._update(self._apply(other, "__or__"))
+
+    def __iand__(self, other):
+        return self._update(self._apply(other, "__and__"))
+
+    def __isub__(self, other):
+        return self._update(self._apply(other, "__sub__"))
+
+    def __ixor__(self, other):
+        return self._update(self._apply(other, "__xor__"))
+
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+    symmetric_difference = __xor__
+    update = __ior__
+    intersection_update = __iand__
+    difference_update = __isub__
+    symmetric_difference_update = __ixor__
+
+    def issubset(self, other):
+        """Check whether every element in the set is in ``other``."""
+        return not (self - other)
+
+    def isdisjoint(self, other):
+        """Return ``True`` if the set has no elements in common with
+        ``other``."""
+        return not (self & other)
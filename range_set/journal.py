@@ -0,0 +1,121 @@
+"""A RangeSet that records its changes, for synchronizing replicas."""
+
+from collections import namedtuple
+
+from . import _SUB, RangeSet, _merge
+
+__all__ = ["JournaledRangeSet", "Delta"]
+
+Delta = namedtuple("Delta", "since version full added removed")
+Delta.__doc__ = """The changes of a `JournaledRangeSet` between two versions.
+
+``added`` and ``removed`` are lists of ``(start, end)`` tuples. If
+``full`` is set, ``added`` is the complete content of the set and
+``removed`` is empty.
+
+Pass this to ``RangeSet.apply_delta``.
+"""
+
+# The journal is compacted when it has this many entries more than the
+# set has intervals.
+SLACK = 64
+
+
+class JournaledRangeSet(RangeSet):
+    """A RangeSet that records the ranges added and removed since each
+    version.
+
+    ``version`` is a token for the current state. ``delta_since(token)``
+    returns the net changes since then, which a replica at that state
+    applies with ``apply_delta``. A new replica starts with
+    ``delta_since(0)``, which returns the whole set.
+
+    The journal is compacted when it grows larger than the set itself:
+    the older half is dropped, and ``delta_since`` returns the whole
+    set for tokens from that part.
+    """
+
+    __slots__ = ("_journal", "_base")
+
+    def __init__(self, iter=None, store=None):
+        self._journal = []  # (start, end, added)
+        self._base = 1
+        super().__init__(iter, store=store)
+
+    def __getstate__(self):
+        return (super().__getstate__(), self._base, self._journal)
+
+    def __setstate__(self, state):
+        items, self._base, journal = state
+        self._journal = list(journal)
+        self._set = None
+        super().__setstate__(items)
+
+    @property
+    def version(self):
+        """A token for the current state of the set."""
+        return self._base + len(self._journal)
+
+    def _record(self, x, y, added):
+        j = self._journal
+        j.append((x, y, added))
+        if len(j) > len(self._set) + SLACK:
+            k = len(j) // 2
+            del j[:k]
+            self._base += k
+
+    def add(self, x, y=None):
+        if y is None:
+            y = x + 1
+        super().add(x, y)
+        self._record(x, y, True)
+
+    add.__doc__ = RangeSet.add.__doc__
+
+    def remove(self, x, y=None, error=True):
+        if y is None:
+            y = x + 1
+        super().remove(x, y, error=error)
+        self._record(x, y, False)
+
+    remove.__doc__ = RangeSet.remove.__doc__
+
+    def _replace(self, data):
+        old = self._set
+        super()._replace(data)
+        if old is None:
+            # unpickling: the journal is restored as well
+            return
+        if not old:
+            # older tokens get the whole set, instead of a journal entry
+            # per interval
+            if data:
+                self._base = self.version + 1
+                self._journal = []
+            return
+        for x, y in _merge(old, data, _SUB, old.new()):
+            self._record(x, y, False)
+        for x, y in _merge(data, old, _SUB, data.new()):
+            self._record(x, y, True)
+
+    def delta_since(self, token):
+        """Return a `Delta` with the changes since version ``token``.
+
+        Raises ``ValueError`` if the token is newer than the set.
+        """
+        v = self.version
+        if token > v:
+            raise ValueError("unknown version %r" % (token,))
+        if token < self._base:
+            return Delta(token, v, True, list(self._set), [])
+
+        added = RangeSet()
+        removed = RangeSet()
+        for x, y, add in self._journal[token - self._base:]:
+            if add:
+                added.add(x, y)
+                removed.discard(x, y)
+            else:
+                removed.add(x, y)
+                added.discard(x, y)
+        return Delta(token, v, False, list(added), list(removed))
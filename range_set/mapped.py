@@ -0,0 +1,74 @@
+"""A read-only RangeSet backed by a memory-mapped file."""
+
+import mmap
+from array import array
+
+from . import _SOLE, FrozenRangeSet, RangeSet, _owners, serial
+from .store import IntervalArray, IntervalView
+
+__all__ = ["MappedRangeSet"]
+
+
+class MappedRangeSet(FrozenRangeSet):
+    """A RangeSet that searches the boundaries stored in a file directly,
+    without loading them.
+
+    Create the file with ``RangeSet.to_file``. Like `FrozenRangeSet`, only
+    the read-only part of the RangeSet API is available. Set operations
+    return ordinary RangeSets.
+
+    Mapping requires a little-endian system; elsewhere the file is
+    loaded into memory.
+    """
+
+    __slots__ = ("_path", "_mmap")
+
+    def __init__(self, path):
+        self._path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            b = serial.decode(self._mmap, verify=False)
+            if not isinstance(b, (memoryview, array)):
+                raise ValueError("%r: not a fixed-width RangeSet file" % (path,))
+        except BaseException:
+            self._mmap.close()
+            raise
+        if isinstance(b, array):
+            # not little-endian: the boundaries have been copied
+            self._mmap.close()
+            self._replace(IntervalArray().new_edges(b))
+        else:
+            self._replace(IntervalView(b))
+
+    def close(self):
+        """Unmap the file. The set is empty afterwards.
+
+        If copies of this set still share its storage, the file stays
+        mapped until they no longer need it.
+        """
+        b = self._set.edges()
+        shared = self._shared is not None and _owners(self) > _SOLE
+        self._replace(IntervalView(()))
+        if not shared:
+            if isinstance(b, memoryview):
+                b.release()
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *tb):
+        self.close()
+
+    def __reduce__(self):
+        return (self.__class__, (self._path,))
+
+    def _new(self, data):
+        s = RangeSet()
+        s._replace(data)
+        return s
+
+    def copy(self):
+        """Return a new (ordinary) RangeSet with a copy of s."""
+        return RangeSet(self)
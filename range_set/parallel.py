@@ -0,0 +1,208 @@
+"""Set operations on very large RangeSets, spread across processes.
+
+The operands are cut into partitions at common split points, which are
+sampled from both operands so that each partition holds about the same
+number of intervals. Each partition is processed by a
+``ProcessPoolExecutor`` worker; the results are concatenated, joining
+intervals that touch at a split point.
+
+Partitions are sent to the workers, and results returned, as packed
+64-bit boundaries, so the calling process mostly copies memory. This
+is cheapest for stores that keep their boundaries in an array, like
+``IntervalArray`` and ``MappedRangeSet``; other stores are converted.
+Sets with values that don't fit in 64 bits are processed serially.
+Below ``threshold`` intervals the operations run serially as well.
+
+All functions accept these keyword arguments:
+
+* ``workers``: the number of processes (default: ``os.cpu_count()``).
+* ``threshold``: the combined number of intervals below which the
+  operation runs in this process.
+* ``executor``: an existing executor to use instead of a new pool of
+  ``workers`` processes.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import chain
+
+from . import _AND, _OR, _SUB, RangeSet, _merge
+from .store import IntervalArray, IntervalView
+
+__all__ = ["union", "intersection", "difference", "count", "issubset"]
+
+THRESHOLD = 1000000
+
+# The number of split point candidates sampled per partition and operand
+SAMPLES = 4
+
+
+def _edges(rs, lo, hi):
+    """Return the boundaries of ``rs`` within [lo…hi) as packed 64-bit
+    integers.
+
+    Raises ``OverflowError`` if they don't fit.
+    """
+    s = rs._set
+    if not s:
+        return b""
+    p = 0
+    if lo is not None:
+        p, pi = s.find(lo)
+        if not pi:
+            p += 1
+    q = len(s) - 1
+    if hi is not None:
+        q, _ = s.find(hi - 1)
+    if p > q:
+        return b""
+
+    e = s.edges()
+    if isinstance(e, (array, memoryview)):
+        res = array("q")
+        res.frombytes(memoryview(e)[2 * p:2 * q + 2].cast("B"))
+    else:
+        res = array("q", chain.from_iterable(s[p:q + 1]))
+    if lo is not None and res[0] < lo:
+        res[0] = lo
+    if hi is not None and res[-1] > hi:
+        res[-1] = hi
+    return res.tobytes()
+
+
+def _view(e):
+    return IntervalView(memoryview(e).cast("q"))
+
+
+def _merge_part(ea, eb, op, test):
+    res = _merge(_view(ea), _view(eb), op, IntervalArray())
+    if test:
+        return not res
+    return res.edges().tobytes()
+
+
+def _count_part(e):
+    b = memoryview(e).cast("q")
+    return sum(b[1::2]) - sum(b[::2])
+
+
+def _splits(sets, parts):
+    """Return up to ``parts + 1`` increasing split values for ``sets``,
+    so that each partition holds about the same number of their
+    intervals; the first and last are ``None``, i.e. unbounded."""
+    samples = []
+    total = 0
+    for rs in sets:
+        s = rs._set
+        n = len(s)
+        total += n
+        k = min(n, parts * SAMPLES)
+        for i in range(k):
+            # each sample stands for the n/k intervals that follow it
+            samples.append((s[i * n // k][0], n / k))
+    samples.sort()
+
+    res = [None]
+    done = 0
+    i = 1
+    for x, w in samples:
+        if i == parts:
+            break
+        if done >= i * total / parts:
+            if res[-1] is None or x > res[-1]:
+                res.append(x)
+            i += 1
+        done += w
+    res.append(None)
+    return res
+
+
+def _run(fn, args, workers, executor):
+    if executor is None:
+        ctx = ProcessPoolExecutor(workers)
+    else:
+        ctx = nullcontext(executor)
+    with ctx as ex:
+        return list(ex.map(fn, *zip(*args)))
+
+
+def _parts(a, b, op, test, workers, executor):
+    sp = _splits((a, b), workers or os.cpu_count() or 1)
+    args = []
+    for lo, hi in zip(sp, sp[1:]):
+        args.append((_edges(a, lo, hi), _edges(b, lo, hi), op, test))
+    return _run(_merge_part, args, workers, executor)
+
+
+def _combine(a, b, op, workers, threshold, executor):
+    if not isinstance(b, RangeSet):
+        b = RangeSet(b)
+    if len(a) + len(b) >= threshold:
+        try:
+            parts = _parts(a, b, op, False, workers, executor)
+        except OverflowError:
+            pass
+        else:
+            res = array("q")
+            for part in parts:
+                part = memoryview(part).cast("q")
+                if res and part and res[-1] == part[0]:
+                    # the intervals touch at a split point
+                    res.pop()
+                    part = part[1:]
+                res.frombytes(part.cast("B"))
+            return a._new(a._set.new_edges(res))
+    return a._new(_merge(a._set, b._set, op, a._set.new()))
+
+
+def union(a, b, workers=None, threshold=THRESHOLD, executor=None):
+    """Return a new set with the elements of ``a`` and ``b``."""
+    return _combine(a, b, _OR, workers, threshold, executor)
+
+
+def intersection(a, b, workers=None, threshold=THRESHOLD, executor=None):
+    """Return a new set with the elements common to ``a`` and ``b``."""
+    return _combine(a, b, _AND, workers, threshold, executor)
+
+
+def difference(a, b, workers=None, threshold=THRESHOLD, executor=None):
+    """Return a new set with the elements of ``a`` that are not in ``b``."""
+    return _combine(a, b, _SUB, workers, threshold, executor)
+
+
+def count(a, workers=None, threshold=THRESHOLD, executor=None):
+    """Count the elements in ``a``, like ``a.count()``.
+
+    The result is cached in ``a``, so this is O(1) if the set's count is
+    already known.
+    """
+    if a._count is not None or len(a) < threshold:
+        return a.count()
+    sp = _splits((a,), workers or os.cpu_count() or 1)
+    try:
+        args = [(_edges(a, lo, hi),) for lo, hi in zip(sp, sp[1:])]
+    except OverflowError:
+        return a.count()
+    n = sum(_run(_count_part, args, workers, executor))
+    a._count = n
+    return n
+
+
+def issubset(a, b, proper=False, workers=None, threshold=THRESHOLD, executor=None):
+    """Check whether every element of ``a`` is in ``b``, like
+    ``a.issubset(b, proper)``."""
+    if not isinstance(b, RangeSet):
+        b = RangeSet(b)
+    if len(a) + len(b) < threshold:
+        return a.issubset(b, proper)
+    try:
+        parts = _parts(a, b, _SUB, True, workers, executor)
+    except OverflowError:
+        return a.issubset(b, proper)
+    if not all(parts):
+        return False
+    if not proper:
+        return True
+    return count(a, workers, threshold, executor) < count(b, workers, threshold, executor)
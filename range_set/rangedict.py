@@ -0,0 +1,188 @@
+"""A mapping from ranges of integers to values."""
+
+from bisect import bisect_left, bisect_right
+
+from . import RangeSet
+
+__all__ = ["RangeDict"]
+
+_DELETE = object()
+
+
+class RangeDict:
+    """Maps ranges of integers to values.
+
+    Setting a range overwrites whatever overlapped it. Adjacent ranges
+    with equal values are merged, so the dict holds the smallest number
+    of ranges that represents its content.
+
+    ``d[x]`` returns the value for ``x`` in O(log n). ``d[x:y] = v`` and
+    ``del d[x:y]`` set or clear the range [x…y), which takes O(log n)
+    plus the cost of shifting the following ranges. Iterating yields
+    ``(start, end)`` tuples.
+    """
+
+    __slots__ = ("_starts", "_ends", "_vals")
+
+    def __init__(self, items=None):
+        """Create a RangeDict, optionally from ``((start, end), value)``
+        pairs, which are applied in order."""
+        self._starts = []
+        self._ends = []
+        self._vals = []
+        if items is not None:
+            for (x, y), v in items:
+                self.set(x, y, v)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self.items()))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return zip(self._starts, self._ends)
+
+    def __eq__(self, other):
+        if not isinstance(other, RangeDict):
+            return NotImplemented
+        return (
+            self._starts == other._starts
+            and self._ends == other._ends
+            and self._vals == other._vals
+        )
+
+    __hash__ = None
+
+    def copy(self):
+        """Return a shallow copy."""
+        d = self.__class__()
+        d._starts = self._starts[:]
+        d._ends = self._ends[:]
+        d._vals = self._vals[:]
+        return d
+
+    def _find(self, x):
+        """Return the index of the range containing ``x``, or -1."""
+        i = bisect_right(self._starts, x) - 1
+        if i >= 0 and x < self._ends[i]:
+            return i
+        return -1
+
+    def __getitem__(self, x):
+        i = self._find(x)
+        if i < 0:
+            raise KeyError(x)
+        return self._vals[i]
+
+    def get(self, x, default=None):
+        """Return the value for ``x``, or ``default``."""
+        i = self._find(x)
+        return default if i < 0 else self._vals[i]
+
+    def __contains__(self, x):
+        return self._find(x) >= 0
+
+    @staticmethod
+    def _range(key):
+        if isinstance(key, slice):
+            if key.step is not None:
+                raise ValueError("slices must not have a step")
+            return key.start, key.stop
+        return key, key + 1
+
+    def __setitem__(self, key, value):
+        self.set(*self._range(key), value)
+
+    def __delitem__(self, key):
+        x, y = self._range(key)
+        if not self.delete(x, y):
+            raise KeyError(key)
+
+    def set(self, x, y, value):
+        """Map the range [x…y) to ``value``."""
+        if x < y:
+            self._splice(x, y, value)
+
+    def delete(self, x, y=None):
+        """Remove the range [x…y), or just ``x``, from the dict.
+
+        Returns ``True`` if anything was removed.
+        """
+        if y is None:
+            y = x + 1
+        if x >= y:
+            return False
+        return self._splice(x, y, _DELETE)
+
+    def _splice(self, x, y, value):
+        """Replace the content of [x…y) with ``value``.
+
+        Returns ``True`` if an existing range overlapped [x…y).
+        """
+        starts = self._starts
+        ends = self._ends
+        vals = self._vals
+
+        # ranges lo…hi-1 overlap [x…y)
+        lo = bisect_right(starts, x) - 1
+        if lo < 0 or ends[lo] <= x:
+            lo += 1
+        hi = bisect_left(starts, y)
+        found = lo < hi
+
+        new = []
+        if found and starts[lo] < x:
+            new.append((starts[lo], x, vals[lo]))
+        if value is not _DELETE:
+            new.append((x, y, value))
+        if found and ends[hi - 1] > y:
+            new.append((y, ends[hi - 1], vals[hi - 1]))
+
+        # merge with adjacent ranges that have the same value
+        if new and lo > 0 and ends[lo - 1] == new[0][0] and vals[lo - 1] == new[0][2]:
+            lo -= 1
+            new[0] = (starts[lo], new[0][1], new[0][2])
+        if new and hi < len(starts) and starts[hi] == new[-1][1] and vals[hi] == new[-1][2]:
+            new[-1] = (new[-1][0], ends[hi], new[-1][2])
+            hi += 1
+        merged = []
+        for r in new:
+            if merged and merged[-1][1] == r[0] and merged[-1][2] == r[2]:
+                merged[-1] = (merged[-1][0], r[1], r[2])
+            else:
+                merged.append(r)
+
+        starts[lo:hi] = [r[0] for r in merged]
+        ends[lo:hi] = [r[1] for r in merged]
+        vals[lo:hi] = [r[2] for r in merged]
+        return found
+
+    def items(self):
+        """Iterate over ``((start, end), value)`` pairs."""
+        return zip(zip(self._starts, self._ends), self._vals)
+
+    def values(self):
+        """Iterate over the values of all ranges."""
+        return iter(self._vals)
+
+    def overlapping(self, x, y):
+        """Iterate over the ``((start, end), value)`` pairs whose range
+        overlaps [x…y). The ranges are not clipped."""
+        starts = self._starts
+        lo = bisect_right(starts, x) - 1
+        if lo < 0 or self._ends[lo] <= x:
+            lo += 1
+        for i in range(lo, bisect_left(starts, y)):
+            yield (starts[i], self._ends[i]), self._vals[i]
+
+    def keys(self, store=None):
+        """Return the ranges that have a value, as a new RangeSet."""
+        return RangeSet.from_sorted(zip(self._starts, self._ends), store=store)
+
+    def count(self):
+        """Count the integers that have a value."""
+        n = 0
+        for x, y in zip(self._starts, self._ends):
+            n += y - x
+        return n
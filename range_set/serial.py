@@ -0,0 +1,148 @@
+"""Compact binary serialization for RangeSet.
+
+Format:
+
+* ``b"RS"``, a version byte (currently 1) and a flag byte
+* the number of intervals, as varint
+* the boundaries, either
+
+  * as varints: the first one zigzag-encoded, every subsequent one as the
+    difference to its predecessor, minus one (boundaries are strictly
+    increasing), or
+  * if flag bit 0 is set: as little-endian signed 64-bit integers,
+    which is used when that is shorter
+
+* if flag bit 1 is set: the CRC32 of everything before it, as four
+  little-endian bytes.
+"""
+
+import sys
+from array import array
+from itertools import accumulate
+from zlib import crc32
+
+__all__ = ["encode", "decode"]
+
+MAGIC = b"RS"
+VERSION = 1
+
+F_FIXED = 1
+F_CRC = 2
+
+_INT64 = (-(1 << 63), (1 << 63) - 1)
+
+
+def _put(buf, n):
+    while n > 0x7F:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _get(mv, pos):
+    n = 0
+    shift = 0
+    while True:
+        try:
+            b = mv[pos]
+        except IndexError:
+            raise ValueError("truncated data") from None
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def encode(store, checksum=False, fixed=None):
+    """Encode the intervals in a RangeSet store.
+
+    If ``fixed`` is ``None``, the shorter encoding is chosen. Otherwise it
+    forces fixed-width (``True``) or varint (``False``) encoding.
+    """
+    n = len(store)
+    head = bytearray(MAGIC)
+    head.append(VERSION)
+    head.append(0)
+    _put(head, n)
+
+    body = bytearray()
+    if not fixed:
+        it = iter(store.edges())
+        lo = hi = None
+        for x in it:
+            lo = hi = x
+            _put(body, 2 * x if x >= 0 else -2 * x - 1)
+            for y in it:
+                _put(body, y - x - 1)
+                x = y
+            hi = x
+        if fixed is None:
+            fixed = n and len(body) > 16 * n and _INT64[0] <= lo and hi <= _INT64[1]
+
+    flags = 0
+    if fixed:
+        flags |= F_FIXED
+        b = array("q", store.edges())
+        if sys.byteorder == "big":
+            b.byteswap()
+        body = b.tobytes()
+    if checksum:
+        flags |= F_CRC
+    head[3] = flags
+
+    head += body
+    if checksum:
+        head += crc32(head).to_bytes(4, "little")
+    return bytes(head)
+
+
+def decode(data, verify=True):
+    """Decode a buffer created by ``encode``.
+
+    Returns a flat sequence of boundaries. If the data are fixed-width,
+    this is a view into ``data``, on little-endian systems.
+
+    If ``verify`` is cleared, an existing checksum is not checked.
+    """
+    mv = memoryview(data).cast("B")
+    if len(mv) < 5 or mv[0:2] != MAGIC:
+        raise ValueError("not a serialized RangeSet")
+    if mv[2] > VERSION:
+        raise ValueError("unsupported version %d" % mv[2])
+    flags = mv[3]
+    if flags & F_CRC:
+        if len(mv) < 9:
+            raise ValueError("truncated data")
+        if verify and crc32(mv[:-4]) != int.from_bytes(mv[-4:], "little"):
+            raise ValueError("checksum mismatch")
+        mv = mv[:-4]
+
+    n, pos = _get(mv, 4)
+    if flags & F_FIXED:
+        if len(mv) - pos != 16 * n:
+            raise ValueError("wrong data size")
+        if sys.byteorder == "little":
+            return mv[pos:].cast("q")
+        b = array("q", mv[pos:].tobytes())
+        b.byteswap()
+        return b
+
+    vals = []
+    append = vals.append
+    v = shift = 0
+    for b in mv[pos:]:
+        if b < 0x80:
+            append(v | (b << shift))
+            v = shift = 0
+        else:
+            v |= (b & 0x7F) << shift
+            shift += 7
+    if shift or len(vals) != 2 * n:
+        raise ValueError("wrong data size")
+    if not n:
+        return vals
+    z = vals[0]
+    vals[0] = z >> 1 if not z & 1 else -(z >> 1) - 1
+    vals[1:] = map((1).__add__, vals[1:])
+    return list(accumulate(vals))
@@ -0,0 +1,176 @@
+"""A RangeSet that counts what it is doing."""
+
+from . import RangeSet
+
+__all__ = ["InstrumentedRangeSet", "RangeSetStats"]
+
+
+class _Probe(int):
+    """An int that counts how often it is compared by order, to measure
+    the searches of a store without changing them."""
+
+    def __lt__(self, other):
+        self.n += 1
+        return int.__lt__(self, other)
+
+    def __le__(self, other):
+        self.n += 1
+        return int.__le__(self, other)
+
+    def __gt__(self, other):
+        self.n += 1
+        return int.__gt__(self, other)
+
+    def __ge__(self, other):
+        self.n += 1
+        return int.__ge__(self, other)
+
+
+def _bucket(n):
+    """Histogram key for ``n``: the largest power of two ``<= n``, or 0."""
+    return 1 << (n.bit_length() - 1) if n > 0 else 0
+
+
+class RangeSetStats:
+    """Counters collected by an `InstrumentedRangeSet`.
+
+    * ``add``, ``remove``: the number of calls.
+    * ``add_fast``: additions that appended or inserted a new interval
+      without touching any existing one.
+    * ``add_slow``: additions that extended or merged intervals.
+    * ``remove_fast``: removals that trimmed or split a single interval.
+    * ``remove_slow``: removals that deleted whole intervals.
+    * ``remove_miss``: removals that found nothing to remove.
+    * ``find``: searches for a value.
+    * ``find_steps``, ``find_max_steps``: the total and the maximum
+      number of comparisons per search, as made by the store's ``find``.
+    * ``shifts``: the number of inserted or deleted intervals.
+    * ``shift_total``, ``shift_max``: the total and the maximum number of
+      intervals after the insertion or deletion point, which a list store
+      has to move.
+    * ``shift_hist``: a histogram of those numbers; maps ``2**k`` to the
+      number of shifts of ``2**k`` to ``2**(k+1)-1`` intervals, and 0 to
+      the number of shifts that did not move anything.
+    """
+
+    __slots__ = (
+        "add",
+        "add_fast",
+        "add_slow",
+        "remove",
+        "remove_fast",
+        "remove_slow",
+        "remove_miss",
+        "find",
+        "find_steps",
+        "find_max_steps",
+        "shifts",
+        "shift_total",
+        "shift_max",
+        "shift_hist",
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Set all counters to zero."""
+        for k in self.__slots__:
+            setattr(self, k, 0)
+        self.shift_hist = {}
+
+    def as_dict(self):
+        """Return the counters as a dict, e.g. for exporting them."""
+        res = {k: getattr(self, k) for k in self.__slots__}
+        res["shift_hist"] = dict(sorted(self.shift_hist.items()))
+        return res
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.as_dict())
+
+    def _shift(self, n):
+        self.shifts += 1
+        self.shift_total += n
+        if n > self.shift_max:
+            self.shift_max = n
+        k = _bucket(n)
+        self.shift_hist[k] = self.shift_hist.get(k, 0) + 1
+
+
+class InstrumentedRangeSet(RangeSet):
+    """A RangeSet that counts calls of ``add``, ``remove`` and ``_find``
+    in its ``stats`` attribute, a `RangeSetStats` object.
+
+    Counting slows these methods down, so use this class only where you
+    need the numbers; plain RangeSet objects are not affected. Several
+    sets may share a ``stats`` object. Copies get a new one.
+
+    Bulk operations like ``|=`` are not counted.
+    """
+
+    __slots__ = ("stats",)
+
+    def __init__(self, iter=None, store=None, stats=None):
+        self.stats = RangeSetStats() if stats is None else stats
+        super().__init__(iter, store=store)
+
+    def __setstate__(self, state):
+        self.stats = RangeSetStats()
+        super().__setstate__(state)
+
+    def _find(self, x):
+        st = self.stats
+        st.find += 1
+        p = _Probe(x)
+        p.n = 0
+        try:
+            return self._set.find(p)
+        finally:
+            st.find_steps += p.n
+            if p.n > st.find_max_steps:
+                st.find_max_steps = p.n
+
+    def _after(self, y):
+        """Return the number of intervals that start at or after ``y``."""
+        s = self._set
+        if not s:
+            return 0
+        k, _ = s.find(y - 1)
+        return len(s) - 1 - k
+
+    def add(self, x, y=None):
+        st = self.stats
+        st.add += 1
+        n = len(self._set)
+        super().add(x, y)
+        m = len(self._set)
+        if m > n:
+            st.add_fast += 1
+            st._shift(self._after(x + 1 if y is None else y))
+        else:
+            st.add_slow += 1
+            if m < n:
+                st._shift(self._after(x + 1 if y is None else y))
+
+    add.__doc__ = RangeSet.add.__doc__
+
+    def remove(self, x, y=None, error=True):
+        st = self.stats
+        st.remove += 1
+        n = len(self._set)
+        try:
+            super().remove(x, y)
+        except KeyError:
+            st.remove_miss += 1
+            if error:
+                raise
+            return
+        m = len(self._set)
+        if m >= n:
+            st.remove_fast += 1
+        else:
+            st.remove_slow += 1
+        if m != n:
+            st._shift(self._after(x + 1 if y is None else y))
+
+    remove.__doc__ = RangeSet.remove.__doc__
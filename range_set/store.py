@@ -0,0 +1,511 @@
+"""Storage engines for RangeSet.
+
+A store is a sequence of ``(start, end)`` tuples, sorted and coalesced,
+which supports the subset of the ``list`` API that ``RangeSet`` uses:
+
+* ``len(s)``, ``s[i]``, ``s[i] = (x, y)``, iteration
+* ``del s[i:j]``, ``s.insert(i, (x, y))``, ``s.append((x, y))``
+* ``s.copy()``: a copy of the same kind
+* ``s.new(data)``: an empty store of the same kind, filled from ``data``
+* ``s.edges()``: a flat iterable of all boundaries
+* ``s.new_edges(e)``: like ``new``, but filled from a flat boundary sequence
+* ``s.find(x)``: the position of ``x``, as described in ``RangeSet._find``
+* ``s.nbytes()``: the approximate memory used by the store
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from sys import getsizeof
+
+__all__ = ["IntervalList", "IntervalView", "IntervalArray", "IntervalChunks"]
+
+
+# The maximum distance, in intervals, that IntervalList.find gallops
+# away from its finger before it bisects the rest of the list.
+_GALLOP = 8
+
+
+def _tuple_bytes(items):
+    """Return the memory used by a sequence of ``(start, end)`` tuples,
+    not counting the sequence itself."""
+    return sum(getsizeof(t) + getsizeof(t[0]) + getsizeof(t[1]) for t in items)
+
+
+class IntervalList(list):
+    """The default store: a plain list of tuples.
+
+    ``find`` remembers the position it found last and first searches
+    outwards from there, doubling its step. Lookups near the previous
+    one (like sequential scans, or an add close to the last one) thus
+    take O(log d) for a distance of d intervals. Lookups further away
+    bisect the rest of the list. The remembered position is only a
+    hint, so it does not need to be adjusted when intervals are inserted
+    or deleted.
+    """
+
+    __slots__ = ("_finger",)
+
+    def __init__(self, data=()):
+        super().__init__(data)
+        self._finger = 0
+
+    def __reduce__(self):
+        return (IntervalList, (list(self),))
+
+    def copy(self):
+        return IntervalList(self)
+
+    def new(self, data=()):
+        return IntervalList(data)
+
+    def edges(self):
+        for x, y in self:
+            yield x
+            yield y
+
+    def new_edges(self, e):
+        if hasattr(e, "tolist"):
+            e = e.tolist()
+        it = iter(e)
+        return IntervalList(zip(it, it))
+
+    def nbytes(self):
+        return getsizeof(self) + _tuple_bytes(self)
+
+    def find(self, x):
+        s = self
+        n = len(s)
+        if x >= s[-1][1]:
+            return (n - 1, False)
+        if x >= s[-1][0]:
+            return (n - 1, True)
+        if x < s[0][0]:
+            return (-1, False)
+
+        # s[0][0] <= x < s[n-1][0]: look for the last start <= x,
+        # galloping away from the finger for a few steps.
+        f = self._finger
+        if f >= n - 1:
+            f = n - 2
+        if s[f][0] <= x:
+            lo = f
+            hi = f + 1
+            step = 1
+            while s[hi][0] <= x:
+                lo = hi
+                if step > _GALLOP:
+                    hi = n - 1
+                    break
+                hi = lo + step
+                step <<= 1
+                if hi >= n - 1:
+                    hi = n - 1
+                    break
+        else:
+            hi = f
+            lo = f - 1
+            step = 1
+            while s[lo][0] > x:
+                hi = lo
+                if step > _GALLOP:
+                    lo = 0
+                    break
+                lo = hi - step
+                step <<= 1
+                if lo <= 0:
+                    lo = 0
+                    break
+        # s[lo][0] <= x < s[hi][0]. ``(x,)`` sorts before any ``(x, y)``,
+        # so this finds the first start >= x.
+        p = bisect_left(s, (x,), lo + 1, hi)
+        if p == hi or s[p][0] != x:
+            p -= 1
+        self._finger = p
+        return (p, x < s[p][1])
+
+
+class IntervalView:
+    """A read-only store on top of a flat sequence of boundaries, such as
+    a memoryview.
+
+    Interval ``n`` is ``[b[2n], b[2n+1])``. Tuples are created on demand
+    when indexing or iterating.
+
+    Copies of this store are ``IntervalArray`` instances.
+    """
+
+    __slots__ = ("_b",)
+
+    def __init__(self, b):
+        self._b = b
+
+    def __len__(self):
+        return len(self._b) >> 1
+
+    def __iter__(self):
+        it = iter(self._b)
+        return zip(it, it)
+
+    def __reversed__(self):
+        it = reversed(self._b)
+        for y, x in zip(it, it):
+            yield (x, y)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __eq__(self, other):
+        if isinstance(other, IntervalView):
+            return self._b == other._b
+        return list(self) == list(other)
+
+    def _pos(self, i):
+        n = len(self._b) >> 1
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return 2 * i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = self._pos(i)
+        return (self._b[i], self._b[i + 1])
+
+    def copy(self):
+        return self.new_edges(self._b)
+
+    def new(self, data=()):
+        return IntervalArray(data)
+
+    def edges(self):
+        return self._b
+
+    def new_edges(self, e):
+        s = IntervalArray()
+        try:
+            s._b.frombytes(e)
+        except TypeError:
+            s._b.extend(e)
+        return s
+
+    def nbytes(self):
+        b = self._b
+        if isinstance(b, memoryview):
+            return getsizeof(self) + getsizeof(b) + b.nbytes
+        return getsizeof(self) + getsizeof(b)
+
+    def find(self, x):
+        k = bisect_right(self._b, x)
+        if k & 1:
+            return (k >> 1, True)
+        return ((k >> 1) - 1, False)
+
+
+class IntervalArray(IntervalView):
+    """A compact store that keeps all boundaries in a single typed array.
+
+    This uses 16 bytes per interval instead of ~120 for a list of tuples,
+    but is restricted to values that fit in a signed 64-bit integer.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data=()):
+        self._b = b = array("q")
+        for x in data:
+            b.extend(x)
+
+    def __setitem__(self, i, v):
+        i = self._pos(i)
+        self._b[i], self._b[i + 1] = v
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("slices must be contiguous")
+            if start < stop:
+                del self._b[2 * start:2 * stop]
+        else:
+            i = self._pos(i)
+            del self._b[i:i + 2]
+
+    def insert(self, i, v):
+        n = len(self)
+        if i < 0:
+            i = max(i + n, 0)
+        elif i > n:
+            i = n
+        self._b[2 * i:2 * i] = array("q", v)
+
+    def append(self, v):
+        self._b.extend(v)
+
+    def copy(self):
+        s = IntervalArray()
+        s._b = self._b[:]
+        return s
+
+
+class IntervalChunks:
+    """A store that splits its intervals into chunks of about ``load``
+    entries each.
+
+    Inserting or deleting an interval only shifts entries within a
+    single chunk. Chunks are located by bisecting their first start
+    value (for ``find``) or via a Fenwick tree of chunk lengths (for
+    positional access), so all operations are O(log n + load).
+
+    Use ``functools.partial(IntervalChunks, load=N)`` as a RangeSet's
+    store to change the chunk size.
+
+    Copies share their chunks. A chunk is duplicated when either copy
+    modifies it.
+    """
+
+    __slots__ = ("_chunks", "_mins", "_fen", "_len", "_load", "_own")
+
+    def __init__(self, data=(), load=512):
+        self._load = load
+        self._own = set()
+        chunks = []
+        it = iter(data)
+        while True:
+            ch = list(islice(it, load))
+            if not ch:
+                break
+            chunks.append(ch)
+            self._own.add(id(ch))
+        self._set_chunks(chunks)
+
+    def _set_chunks(self, chunks):
+        self._chunks = chunks
+        self._mins = [ch[0][0] for ch in chunks]
+        self._len = sum(len(ch) for ch in chunks)
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuild the Fenwick tree after the list of chunks changed."""
+        n = len(self._chunks)
+        fen = [0] * (n + 1)
+        for i, ch in enumerate(self._chunks, 1):
+            fen[i] += len(ch)
+            j = i + (i & -i)
+            if j <= n:
+                fen[j] += fen[i]
+        self._fen = fen
+
+    def _resize(self, c, delta):
+        """Chunk ``c`` has grown by ``delta`` entries."""
+        fen = self._fen
+        n = len(fen)
+        c += 1
+        while c < n:
+            fen[c] += delta
+            c += c & -c
+        self._len += delta
+
+    def _offset(self, c):
+        """Return the position of the first entry of chunk ``c``."""
+        fen = self._fen
+        r = 0
+        while c:
+            r += fen[c]
+            c -= c & -c
+        return r
+
+    def _locate(self, i):
+        """Return the chunk number and the offset within that chunk for
+        the entry at position ``i``."""
+        n = self._len
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        if i == n - 1:
+            c = len(self._chunks) - 1
+            return c, len(self._chunks[c]) - 1
+        fen = self._fen
+        k = len(fen) - 1
+        c = 0
+        step = 1 << (k.bit_length() - 1)
+        while step:
+            if c + step <= k and fen[c + step] <= i:
+                c += step
+                i -= fen[c]
+            step >>= 1
+        return c, i
+
+    def _chunk(self, c):
+        """Return chunk ``c`` for modification.
+
+        Chunks that are shared with a copy are duplicated first.
+        """
+        ch = self._chunks[c]
+        if id(ch) not in self._own:
+            ch = self._chunks[c] = ch[:]
+            self._own.add(id(ch))
+        return ch
+
+    def _split(self, c):
+        """Split chunk ``c`` if it is too large."""
+        ch = self._chunks[c]
+        if len(ch) <= 2 * self._load:
+            return
+        ch = self._chunk(c)
+        nch = ch[self._load:]
+        self._own.add(id(nch))
+        del ch[self._load:]
+        self._chunks.insert(c + 1, nch)
+        self._mins.insert(c + 1, nch[0][0])
+        self._reindex()
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for ch in self._chunks:
+            yield from ch
+
+    def __reversed__(self):
+        for ch in reversed(self._chunks):
+            yield from reversed(ch)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __eq__(self, other):
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        c, j = self._locate(i)
+        return self._chunks[c][j]
+
+    def __setitem__(self, i, v):
+        c, j = self._locate(i)
+        self._chunk(c)[j] = v
+        if not j:
+            self._mins[c] = v[0]
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("slices must be contiguous")
+            if start >= stop:
+                return
+        else:
+            start = i + self._len if i < 0 else i
+            if not 0 <= start < self._len:
+                raise IndexError(i)
+            stop = start + 1
+
+        c1, j1 = self._locate(start)
+        c2, j2 = self._locate(stop - 1)
+        chunks = self._chunks
+        reindex = c1 != c2
+        if reindex:
+            del self._chunk(c1)[j1:]
+            del self._chunk(c2)[:j2 + 1]
+            del chunks[c1 + 1:c2]
+            del self._mins[c1 + 1:c2]
+            self._len -= stop - start
+            c = c1 + 1
+        else:
+            del self._chunk(c1)[j1:j2 + 1]
+            self._resize(c1, -(j2 + 1 - j1))
+            c = c1
+        if c < len(chunks) and chunks[c]:
+            self._mins[c] = chunks[c][0][0]
+
+        # Drop empty chunks and merge a small chunk into its successor.
+        while c1 <= c and c1 < len(chunks):
+            ch = chunks[c1]
+            if not ch:
+                del chunks[c1]
+                del self._mins[c1]
+            elif c1 + 1 < len(chunks) and len(ch) + len(chunks[c1 + 1]) <= self._load:
+                self._chunk(c1).extend(chunks[c1 + 1])
+                del chunks[c1 + 1]
+                del self._mins[c1 + 1]
+            else:
+                c1 += 1
+                continue
+            c -= 1
+            reindex = True
+        if reindex:
+            self._reindex()
+
+    def insert(self, i, v):
+        n = self._len
+        if i < 0:
+            i = max(i + n, 0)
+        if i >= n:
+            self.append(v)
+            return
+        c, j = self._locate(i)
+        self._chunk(c).insert(j, v)
+        if not j:
+            self._mins[c] = v[0]
+        self._resize(c, 1)
+        self._split(c)
+
+    def append(self, v):
+        if not self._chunks:
+            ch = [v]
+            self._own.add(id(ch))
+            self._set_chunks([ch])
+            return
+        c = len(self._chunks) - 1
+        self._chunk(c).append(v)
+        self._resize(c, 1)
+        self._split(c)
+
+    def copy(self):
+        s = IntervalChunks(load=self._load)
+        s._set_chunks(self._chunks[:])
+        # Neither store may now modify any of these chunks in place.
+        self._own.clear()
+        return s
+
+    def new(self, data=()):
+        return IntervalChunks(data, load=self._load)
+
+    def edges(self):
+        for x, y in self:
+            yield x
+            yield y
+
+    def new_edges(self, e):
+        if hasattr(e, "tolist"):
+            e = e.tolist()
+        it = iter(e)
+        return IntervalChunks(zip(it, it), load=self._load)
+
+    def nbytes(self):
+        n = getsizeof(self) + getsizeof(self._chunks)
+        n += getsizeof(self._mins) + getsizeof(self._fen)
+        for ch in self._chunks:
+            n += getsizeof(ch) + _tuple_bytes(ch)
+        return n
+
+    def find(self, x):
+        c = bisect_right(self._mins, x) - 1
+        if c < 0:
+            return (-1, False)
+        ch = self._chunks[c]
+        lo = 1
+        hi = len(ch)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if x < ch[mid][0]:
+                hi = mid
+            else:
+                lo = mid + 1
+        lo -= 1
+        return (self._offset(c) + lo, x < ch[lo][1])
@@ -0,0 +1,88 @@
+from range_set import AsyncRangeSet, RangeSet
+import asyncio
+import pickle
+
+
+def test_wait_present():
+    async def main():
+        s = AsyncRangeSet((1, 2))
+        done = []
+
+        async def waiter(x, y):
+            await s.wait_present(x, y)
+            done.append((x, y))
+
+        tasks = [asyncio.create_task(waiter(*r)) for r in ((1, 3), (1, 6), (4, 6), (10, 11))]
+        await asyncio.sleep(0)
+        assert done == [(1, 3)]
+        assert s._keys == [3, 4, 10]
+
+        s.add(4)
+        await asyncio.sleep(0)
+        assert done == [(1, 3)]
+        assert s._keys == [3, 5, 10]  # filed under the next missing value
+
+        s.add(3)
+        s.add(5)
+        await asyncio.sleep(0)
+        assert sorted(done) == [(1, 3), (1, 6), (4, 6)]
+
+        tasks[3].cancel()
+        await asyncio.sleep(0)
+        assert s._keys == [] and s._waiters == {} and s._filed == {}
+
+        t = asyncio.create_task(waiter(20, 30))
+        await asyncio.sleep(0)
+        s |= RangeSet([(19, 31)])
+        await t
+        assert done[-1] == (20, 30)
+
+    asyncio.run(main())
+
+
+def test_wait_count():
+    async def main():
+        s = AsyncRangeSet()
+        t1 = asyncio.create_task(s.wait_count(3))
+        t2 = asyncio.create_task(s.wait_count(10))
+        t3 = asyncio.create_task(s.wait_count(5))
+        await asyncio.sleep(0)
+        s.add(1, 3)
+        await asyncio.sleep(0)
+        assert not t1.done()
+        s.add(7)
+        assert await t1 == 3
+        t2.cancel()
+        await asyncio.sleep(0)
+        assert [e[0] for e in s._counters] == [5]
+        s.add(10, 20)
+        assert await t3 == 13
+        assert await s.wait_count(2) == 13
+
+    asyncio.run(main())
+
+
+def test_cancel_many():
+    async def main():
+        s = AsyncRangeSet()
+        tasks = [asyncio.create_task(s.wait_present(x, x + 2)) for x in range(0, 2000, 2)]
+        tasks += [asyncio.create_task(s.wait_count(n)) for n in range(100, 1100)]
+        await asyncio.sleep(0)
+        s.add(0, 11)  # resolves five waiters and refiles (10, 12)
+        assert len(s._filed) == 995 and 11 in s._filed.values()
+        for t in tasks:
+            t.cancel()
+        await asyncio.sleep(0)
+        assert s._waiters == {} and s._keys == [] and s._filed == {}
+        assert s._counters == []
+
+    asyncio.run(main())
+
+
+def test_async_copy():
+    s = AsyncRangeSet((1, 2, 5))
+    assert pickle.loads(pickle.dumps(s)) == s
+    c = s.copy()
+    assert type(c) is AsyncRangeSet
+    c.add(3)
+    assert 3 not in s
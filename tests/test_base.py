@@ -1,6 +1,20 @@
-from range_set import RangeSet
+from range_set import RangeSet, FrozenRangeSet, IntervalList, IntervalArray, IntervalChunks
+from copy import deepcopy
+from functools import partial
+from ipaddress import IPv4Address
 from itertools import permutations
+import pickle
 import pytest
+import weakref
+
+
+@pytest.fixture(
+    params=[IntervalList, IntervalArray, IntervalChunks, partial(IntervalChunks, load=2)],
+    ids=["list", "array", "chunks", "chunks2"],
+)
+def store(request):
+    return request.param
+
 
 _test_create = (
     ((1, 2, 3, 4), [(1, 5)]),
@@ -59,16 +73,16 @@ _test_disjoint = (
 )
 
 
-def test_create():
+def test_create(store):
     for i, o in _test_create:
         for ii in permutations(i):
-            c = RangeSet(ii)
+            c = RangeSet(ii, store=store)
             assert list(c) == o, (ii, o)
 
 
-def test_remove():
+def test_remove(store):
     for i, r, o in _test_remove:
-        c = RangeSet(i)
+        c = RangeSet(i, store=store)
         try:
             if isinstance(r, tuple):
                 c.remove(*r)
@@ -79,10 +93,10 @@ def test_remove():
         assert list(c) == o, (i, r, o)
 
 
-def test_disjoint():
+def test_disjoint(store):
     for i, j, o in _test_disjoint:
-        i = RangeSet(i)
-        j = RangeSet(j)
+        i = RangeSet(i, store=store)
+        j = RangeSet(j, store=store)
         assert o == i.isdisjoint(j)
         assert o == j.isdisjoint(i)
 
@@ -145,6 +159,18 @@ def test_len():
     assert cs.count() == 6
 
 
+def test_non_integers():
+    a = IPv4Address("10.0.0.1")
+    c = RangeSet()
+    c.add(a)
+    c.add(a + 1, a + 5)
+    c.remove(a + 2)
+    assert list(c) == [(a, a + 2), (a + 3, a + 5)]
+    assert a + 4 in c and a + 2 not in c
+    assert c == RangeSet([(a, a + 2), (a + 3, a + 5)])
+    assert c.pop() == a + 4
+
+
 def test_cmp_etc():
     b = RangeSet((1, 3))
     c = RangeSet((1, 3, 4, 5, 7, 8))
@@ -384,3 +410,419 @@ def test_symmetric_difference():
     assert e == RangeSet((3, 4, 7, 8, 9))
     assert gx == RangeSet((5,))
     assert h == RangeSet((1,))
+
+
+def test_merge_random(store):
+    import random
+
+    rnd = random.Random(42)
+    for _ in range(200):
+        a = {rnd.randrange(60) for _ in range(rnd.randrange(40))}
+        b = {rnd.randrange(60) for _ in range(rnd.randrange(40))}
+        ra = RangeSet(a, store=store)
+        rb = RangeSet(b, store=store)
+
+        for op, res in (
+            (ra | rb, a | b),
+            (ra & rb, a & b),
+            (ra - rb, a - b),
+            (ra ^ rb, a ^ b),
+        ):
+            assert op == RangeSet(res), (a, b, op)
+
+        rc = ra.copy()
+        rc |= rb
+        assert rc == RangeSet(a | b)
+        rc = ra.copy()
+        rc &= rb
+        assert rc == RangeSet(a & b)
+        rc = ra.copy()
+        rc -= rb
+        assert rc == RangeSet(a - b)
+        rc = ra.copy()
+        rc ^= rb
+        assert rc == RangeSet(a ^ b)
+
+
+def test_bulk_create(store):
+    def start(x):
+        return x[0] if isinstance(x, tuple) else x
+
+    for i, o in _test_create:
+        assert list(RangeSet.from_iterable(i, store=store)) == o, (i, o)
+        assert list(RangeSet.from_sorted(sorted(i, key=start), store=store)) == o, (i, o)
+
+    assert list(RangeSet.from_sorted(range(5, 100))) == [(5, 100)]
+    assert list(RangeSet.from_iterable(range(100, 5, -1))) == [(6, 101)]
+    assert list(RangeSet([3, (5, 5), 2])) == [(2, 4)]
+
+
+def test_store(store):
+    c = RangeSet((1, 2, 5, 6, 7, 9), store=store)
+    st = type(store())
+    assert type(c._set) is st
+    assert type(c.copy()._set) is st
+    assert type((c | c)._set) is st
+    assert repr(c) == "RangeSet([(1, 3), (5, 8), (9, 10)])"
+    assert c == RangeSet((1, 2, 5, 6, 7, 9))
+    assert pickle.loads(pickle.dumps(c)) == c
+    for p in (pickle.loads(pickle.dumps(c)), pickle.loads(pickle.dumps(c, 0)), deepcopy(c)):
+        assert type(p._set) is st
+        assert getattr(p._set, "_load", None) == getattr(c._set, "_load", None)
+    # the state of older versions
+    p = RangeSet.__new__(RangeSet)
+    p.__setstate__([1, (5, 8)])
+    assert p == RangeSet([1, (5, 8)])
+    assert weakref.ref(c)() is c
+    assert c.pop() == 9
+    c.remove(6)
+    assert list(c) == [(1, 3), (5, 6), (7, 8)]
+
+
+def test_many(store):
+    np = pytest.importorskip("numpy")
+    import random
+
+    rnd = random.Random(1)
+    for _ in range(50):
+        a = {rnd.randrange(60) for _ in range(rnd.randrange(40))}
+        b = [rnd.randrange(-5, 65) for _ in range(rnd.randrange(40))]
+        r = RangeSet(a, store=store)
+
+        mask = r.contains_many(b)
+        assert mask.dtype == bool
+        assert mask.tolist() == [x in a for x in b]
+
+        r.add_many(np.array(b))
+        assert r == RangeSet(a | set(b))
+        assert type(r._set) is type(store())
+        r.discard_many(b)
+        assert r == RangeSet(a - set(b))
+
+    r = RangeSet(store=store)
+    assert r.contains_many([1, 2]).tolist() == [False, False]
+    r.discard_many([])
+    r.add_many([])
+    assert not r
+
+
+def test_store_random(store):
+    import random
+
+    rnd = random.Random(7)
+    c = RangeSet(store=store)
+    ref = RangeSet()
+    for _ in range(3000):
+        x = rnd.randrange(300)
+        y = x + rnd.randrange(1, 8)
+        if rnd.random() < 0.6:
+            c.add(x, y)
+            ref.add(x, y)
+        else:
+            c.discard(x, y)
+            ref.discard(x, y)
+        assert list(c) == list(ref)
+        assert len(c) == len(ref)
+        assert c.count() == sum(b - a for a, b in ref)
+    for x in range(-1, 302):
+        assert (x in c) == (x in ref)
+        assert c._find(x) == ref._find(x)
+
+
+def test_rank_select(store):
+    c = RangeSet((2, 5, 6, 7, 9, 10), store=store)
+    elems = [2, 5, 6, 7, 9, 10]
+    for x in range(0, 13):
+        assert c.rank(x) == sum(1 for e in elems if e < x), x
+    for k, e in enumerate(elems):
+        assert c.select(k) == e
+        assert c.select(k - len(elems)) == e
+    with pytest.raises(IndexError):
+        c.select(6)
+    with pytest.raises(IndexError):
+        c.select(-7)
+
+    c.add(3, 5)
+    assert c.count() == 8
+    assert c.rank(6) == 4
+    assert c.select(4) == 6
+    c.discard(6)
+    assert c.count() == 7
+    assert c.select(4) == 7
+
+    assert RangeSet(store=store).rank(5) == 0
+    with pytest.raises(IndexError):
+        RangeSet(store=store).select(0)
+
+
+def test_bytes(store):
+    for data in (
+        (),
+        (5,),
+        (-3, -1, 0, 1, 2, 7),
+        ((0, 1 << 40), (1 << 41, 1 << 42)),
+        ((-(1 << 62), 1 << 62),),
+    ):
+        c = RangeSet(data, store=store)
+        for checksum in (False, True):
+            b = c.to_bytes(checksum=checksum)
+            assert RangeSet.from_bytes(b, store=store) == c
+            assert RangeSet.from_bytes(bytearray(b)) == c
+            assert RangeSet.from_bytes(memoryview(b)) == c
+
+    c = RangeSet(range(0, 200, 2), store=store)
+    b = c.to_bytes()
+    assert len(b) < 210
+    assert RangeSet.from_bytes(b) == c
+
+    b = c.to_bytes(checksum=True)
+    with pytest.raises(ValueError):
+        RangeSet.from_bytes(b[:5] + b"\xff" + b[6:])
+    with pytest.raises(ValueError):
+        RangeSet.from_bytes(b[:-6])
+    with pytest.raises(ValueError):
+        RangeSet.from_bytes(b"XX" + b[2:])
+
+
+def test_many_sets(store):
+    import random
+
+    rnd = random.Random(9)
+    for _ in range(50):
+        k = rnd.randrange(1, 7)
+        sets = [{rnd.randrange(50) for _ in range(rnd.randrange(30))} for _ in range(k)]
+        rs = [RangeSet(s, store=store) for s in sets]
+
+        for n in range(1, k + 1):
+            want = {x for x in range(50) if sum(x in s for s in sets) >= n}
+            assert RangeSet.at_least(rs, n, store=store) == RangeSet(want)
+        assert RangeSet.union_all(rs) == RangeSet(set().union(*sets))
+        assert RangeSet.intersect_all(rs) == RangeSet(set.intersection(*sets))
+
+        a, *others = rs
+        assert a.union(*others) == RangeSet(set().union(*sets))
+        assert a.intersection(*others) == RangeSet(set.intersection(*sets))
+        assert a.difference(*others) == RangeSet(sets[0].difference(*sets[1:]))
+        c = a.copy()
+        c.update(*others)
+        assert c == RangeSet(set().union(*sets))
+        c = a.copy()
+        c.intersection_update(*others)
+        assert c == RangeSet(set.intersection(*sets))
+        c = a.copy()
+        c.difference_update(*others)
+        assert c == RangeSet(sets[0].difference(*sets[1:]))
+        assert a == RangeSet(sets[0])
+
+    assert RangeSet.union_all([]) == RangeSet()
+    with pytest.raises(ValueError):
+        RangeSet.intersect_all([])
+
+
+def test_irange(store):
+    c = RangeSet(((1, 3), (5, 8), (10, 12), (20, 30)), store=store)
+    assert list(reversed(c)) == list(reversed(list(c)))
+    assert list(c.irange()) == list(c)
+    assert list(c.irange(2, 11)) == [(2, 3), (5, 8), (10, 11)]
+    assert list(c.irange(3, 10)) == [(5, 8)]
+    assert list(c.irange(2, 11, clip=False)) == [(1, 3), (5, 8), (10, 12)]
+    assert list(c.overlapping(7, 25)) == [(5, 8), (10, 12), (20, 30)]
+    assert list(c.irange(7, 25, reverse=True)) == [(20, 25), (10, 12), (7, 8)]
+    assert list(c.irange(None, 6)) == [(1, 3), (5, 6)]
+    assert list(c.irange(11, None)) == [(11, 12), (20, 30)]
+    assert list(c.irange(-5, 0)) == []
+    assert list(c.irange(12, 20)) == []
+    assert list(c.irange(30, 40)) == []
+    assert list(c.irange(2, 2)) == []
+    assert list(c.irange(6, 6, clip=False)) == []
+    assert list(c.irange(7, 2)) == []
+    assert list(RangeSet(store=store).irange(1, 2)) == []
+
+
+def test_gaps(store):
+    c = RangeSet(((1, 3), (5, 8), (10, 12)), store=store)
+    assert list(c.gaps()) == [(3, 5), (8, 10)]
+    assert list(c.gaps(0, 15)) == [(0, 1), (3, 5), (8, 10), (12, 15)]
+    assert list(c.gaps(2, 11)) == [(3, 5), (8, 10)]
+    assert list(c.gaps(4, 6)) == [(4, 5)]
+    assert list(c.gaps(6, 7)) == []
+    assert list(c.gaps(None, 20)) == [(3, 5), (8, 10), (12, 20)]
+    assert list(RangeSet(store=store).gaps(1, 4)) == [(1, 4)]
+    assert list(RangeSet(store=store).gaps()) == []
+
+    v = c.complement((0, 15))
+    assert list(v) == list(RangeSet(range(15)) - c)
+    assert v.count() == 15 - c.count()
+    assert [x for x in range(-2, 18) if x in v] == [0, 3, 4, 8, 9, 12, 13, 14]
+    c.add(3, 5)
+    assert list(v) == [(0, 1), (8, 10), (12, 15)]
+    assert v.count() == 6
+    assert c.complement((2, 2)).count() == 0
+    assert c.complement((6, 11)).count() == 2
+
+
+def test_frozen(store):
+    c = RangeSet((1, 2, 5, 6, 7), store=store)
+    f = c.freeze()
+    assert type(f) is FrozenRangeSet
+    assert f == c
+    assert f._set is c._set
+    assert hash(f) == hash(FrozenRangeSet((1, 2, 5, 6, 7)))
+    assert {f: 1}[FrozenRangeSet(c)] == 1
+
+    c.add(10)
+    assert f._set is not c._set
+    assert f == RangeSet((1, 2, 5, 6, 7))
+    assert 10 in c and 10 not in f
+    c.remove(1)
+    assert 1 in f
+
+    for fn in (f.add, f.remove, f.discard, f.update):
+        with pytest.raises(TypeError):
+            fn(1)
+    with pytest.raises(TypeError):
+        f.pop()
+
+    assert type(f | c) is FrozenRangeSet
+    assert type(f.union(c, c)) is FrozenRangeSet
+    assert type(f - c) is FrozenRangeSet
+    assert f & c == RangeSet((2, 5, 6, 7))
+    x = f.symmetric_difference(c)
+    assert type(x) is FrozenRangeSet
+    assert x == RangeSet((1, 10)) == f ^ c
+    assert f.symmetric_difference(c, c) == f
+    assert f.symmetric_difference() is f
+    g = f
+    g |= c
+    assert type(g) is FrozenRangeSet
+    assert g is not f
+    assert g == RangeSet((1, 2, 5, 6, 7, 10))
+    assert f == RangeSet((1, 2, 5, 6, 7))
+
+    assert f.copy() is f
+    assert pickle.loads(pickle.dumps(f)) == f
+    assert hash(pickle.loads(pickle.dumps(f))) == hash(f)
+    with pytest.raises(TypeError):
+        hash(c)
+
+
+def test_copy_on_write(store):
+    c = RangeSet(range(0, 200, 2), store=store)
+    d = c.copy()
+    e = RangeSet(c)
+    assert d._set is c._set
+    assert e._set is c._set
+
+    d.add(1)
+    assert d._set is not c._set
+    assert 1 in d and 1 not in c and 1 not in e
+    c.discard(4)
+    assert 4 in d and 4 in e and 4 not in c
+    e.add(5, 8)
+    assert list(c)[:3] == [(0, 1), (2, 3), (6, 7)]
+    assert list(d)[:3] == [(0, 3), (4, 5), (6, 7)]
+    assert list(e)[:3] == [(0, 1), (2, 3), (4, 9)]
+    assert c.count() == 99
+    assert d.count() == 101
+    assert e.count() == 102
+
+    # the last set that uses a store changes it in place
+    del d
+    s = c._set
+    c.add(100, 103)
+    assert c._set is s
+    tmp = c.copy()
+    del tmp
+    c.add(1)
+    assert c._set is s
+
+
+def test_chunks_share():
+    c = RangeSet(range(0, 200, 2), store=partial(IntervalChunks, load=10))
+    d = c.copy()
+    d.add(1)
+    shared = sum(a is b for a, b in zip(c._set._chunks, d._set._chunks))
+    assert shared == len(c._set._chunks) - 1
+    assert c == RangeSet(range(0, 200, 2))
+
+
+def test_ingest(store):
+    import random
+
+    rnd = random.Random(16)
+    values = [x + rnd.randrange(-3, 4) for x in range(2000) if rnd.random() < 0.9]
+    seen = []
+    s = RangeSet([(5000, 5001)], store=store)
+    with s.ingest(buffer=64, on_flush=seen.append) as ing:
+        for x in values:
+            ing.add(x)
+        assert len(ing) == len(values) % 64
+    assert len(ing) == 0
+    assert len(seen) == len(values) // 64 + 1 and seen[0] is s
+    assert s == RangeSet(values + [5000], store=store)
+    assert s.count() == len(set(values)) + 1
+
+    s = RangeSet(store=store)
+    s.ingest(values, buffer=7)
+    assert s == RangeSet(values, store=store)
+    s.ingest((-10, -9, -9, 3000))
+    assert s == RangeSet(values + [-10, -9, 3000], store=store)
+
+    f = s.freeze()
+    with pytest.raises(TypeError):
+        f.ingest()
+    with pytest.raises(ValueError):
+        s.ingest(buffer=0)
+
+
+def test_find_finger():
+    import random
+
+    rnd = random.Random(20)
+    s = RangeSet([(x, x + 2) for x in range(0, 300, 5)])
+    r = RangeSet(s, store=IntervalArray)
+    probes = list(range(-3, 305))  # sequential
+    probes += [rnd.randrange(-3, 305) for _ in range(300)]  # random
+    probes += [150 + rnd.randrange(-8, 9) for _ in range(100)]  # clustered
+    for x in probes:
+        assert s._find(x) == r._find(x), x
+    s.add(2, 5)  # shifts the intervals after the finger
+    s.remove(100, 200)
+    r = RangeSet(s, store=IntervalArray)
+    for x in probes:
+        assert s._find(x) == r._find(x), x
+    assert pickle.loads(pickle.dumps(s._set, 0)) == s._set
+
+
+def test_fingerprint(store):
+    import random
+
+    rnd = random.Random(25)
+    s = RangeSet(store=store)
+    s.fingerprint()  # tracked from now on
+    for _ in range(500):
+        x = rnd.randrange(200)
+        y = x + rnd.randrange(1, 10)
+        if rnd.random() < 0.6:
+            s.add(x, y)
+        else:
+            s.discard(x, y)
+        assert s._fp is not None
+        assert s.fingerprint() == RangeSet.from_sorted(list(s)).fingerprint()
+
+    t = RangeSet.from_sorted(list(s), store=store)
+    assert t._fp is None
+    assert s == t and s.fingerprint() == t.fingerprint()
+    t.add(1000)
+    assert s != t and s.fingerprint() != t.fingerprint()
+
+    # cold sets are not fingerprinted just to compare them
+    u = RangeSet.from_sorted(list(s), store=store)
+    v = RangeSet.from_sorted(list(s) + [(1000, 1001)], store=store)
+    assert u != v and u._fp is None and v._fp is None
+    assert u == RangeSet.from_sorted(list(s), store=store) and u._count is None
+
+    # stable across processes and versions
+    assert RangeSet([(1, 2)], store=store).fingerprint() == 1905177804576913875
+    assert RangeSet([(0, 1), (4, 5)]).fingerprint() != RangeSet([(1, 2), (3, 4)]).fingerprint()
+    assert hash(FrozenRangeSet(s)) == s.fingerprint()
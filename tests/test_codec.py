@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
+from range_set import CodedRangeSet, IntervalArray, IntervalList
+from range_set.codec import DATE, DATETIME, IPV4, IPV6, datetime_codec
+import pytest
+
+
+def test_ipv4():
+    s = CodedRangeSet(IPV4, [IPv4Network("10.0.0.0/8"), "192.168.1.1"])
+    assert type(s.raw._set) is IntervalArray
+    assert "10.1.2.3" in s and IPv4Address("11.0.0.0") not in s
+    assert IPv4Network("10.20.0.0/16") in s
+    assert list(s) == [
+        (IPv4Address("10.0.0.0"), IPv4Address("11.0.0.0")),
+        (IPv4Address("192.168.1.1"), IPv4Address("192.168.1.2")),
+    ]
+    s.remove(IPv4Network("10.128.0.0/9"))
+    assert s.count() == (1 << 23) + 1
+    assert s.select(-1) == IPv4Address("192.168.1.1")
+
+    s.add(IPv4Network("0.0.0.0/0"))
+    assert list(s) == [(IPv4Address("0.0.0.0"), None)]
+    assert s.pop() == IPv4Address("255.255.255.255")
+    assert list(s) == [(IPv4Address("0.0.0.0"), IPv4Address("255.255.255.255"))]
+
+
+def test_ipv6():
+    s = CodedRangeSet(IPV6, [IPv6Network("2001:db8::/32")])
+    assert type(s.raw._set) is IntervalList
+    assert "2001:db8::1" in s and "2001:db9::" not in s
+    assert s.count() == 1 << 96
+    assert list(s.gaps(IPv6Address("2001:db7::"), IPv6Address("2001:db9::"))) == [
+        (IPv6Address("2001:db7::"), IPv6Address("2001:db8::"))
+    ]
+
+
+def test_dates():
+    s = CodedRangeSet(DATE, [(date(2024, 1, 1), date(2024, 2, 1))])
+    s.add(date(2024, 2, 1))
+    s.discard(date(2024, 1, 10), date(2024, 1, 20))
+    assert list(s) == [
+        (date(2024, 1, 1), date(2024, 1, 10)),
+        (date(2024, 1, 20), date(2024, 2, 2)),
+    ]
+    assert s.count() == 22
+    assert s.rank(date(2024, 1, 20)) == 9
+    assert list(s.irange(date(2024, 1, 5), date(2024, 1, 25))) == [
+        (date(2024, 1, 5), date(2024, 1, 10)),
+        (date(2024, 1, 20), date(2024, 1, 25)),
+    ]
+
+    t = CodedRangeSet(DATE, [date(2024, 1, 9), date(2024, 1, 10)])
+    assert list(s & t) == [(date(2024, 1, 9), date(2024, 1, 10))]
+    assert s | t == s | [date(2024, 1, 10)]
+    with pytest.raises(ValueError):
+        s | CodedRangeSet(DATETIME)
+
+
+def test_datetimes():
+    c = datetime_codec(timedelta(minutes=1))
+    t0 = datetime(2024, 1, 1, 12, 0, 30)
+    s = CodedRangeSet(c, [(t0, t0 + timedelta(hours=1))])
+    assert t0 + timedelta(minutes=59) in s
+    assert t0 - timedelta(seconds=29) in s  # rounded down
+    assert list(s) == [(datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 13))]
+    assert s.copy() == s
+    assert "CodedRangeSet(datetime/0:01:00" in repr(s)
+
+
+def test_end_of_domain():
+    s = CodedRangeSet(IPV4, [IPv4Network("255.255.255.0/24")])
+    assert list(s) == [(IPv4Address("255.255.255.0"), None)]
+    t = CodedRangeSet(IPV4, list(s))
+    assert t.count() == 256 and t == s
+    assert s | list(s) == s
+    u = CodedRangeSet(IPV4)
+    u.add(IPv4Address("255.255.255.0"), None)
+    assert u == s and u.present("255.255.255.128", None)
+    u.remove("255.255.255.128", None)
+    assert u.count() == 128
+
+    d = CodedRangeSet(DATE, [(date(9999, 12, 1), None)])
+    assert d.count() == 31 and list(d) == [(date(9999, 12, 1), None)]
+    assert CodedRangeSet(DATE, list(d)) == d
@@ -0,0 +1,86 @@
+from range_set import ConcurrentRangeSet, FrozenRangeSet, RangeSet
+import threading
+import pytest
+
+
+def test_basic():
+    c = ConcurrentRangeSet((1, 2, 5))
+    snap = c.snapshot()
+    assert type(snap) is FrozenRangeSet
+    c.add(3)
+    c.discard(5)
+    assert list(c) == [(1, 4)]
+    assert snap == RangeSet((1, 2, 5))
+    assert 3 in c and 5 not in c
+    assert c.present(1, 4)
+    assert c.count() == 3
+    assert len(c) == 1
+    assert c == RangeSet((1, 2, 3))
+
+    c |= RangeSet((10,))
+    c -= RangeSet((1,))
+    assert c == RangeSet((2, 3, 10))
+    assert c.pop() == 10
+    with pytest.raises(KeyError):
+        c.remove(10)
+
+    d = c.copy()
+    d.add(20)
+    assert 20 not in c
+    assert type(c | d) is FrozenRangeSet
+    assert c.symmetric_difference(d) == RangeSet((20,))
+
+
+def test_batch():
+    c = ConcurrentRangeSet()
+    snap = c.snapshot()
+    with c.batch():
+        for x in range(100):
+            c.add(x)
+        with c.batch():
+            c.add(200)
+        assert c.snapshot() is snap
+    assert list(c) == [(0, 100), (200, 201)]
+
+    with pytest.raises(RuntimeError):
+        with c.batch():
+            c.add(300)
+            raise RuntimeError
+    assert 300 not in c
+
+
+def test_threads():
+    c = ConcurrentRangeSet()
+    done = threading.Event()
+    errors = []
+
+    def writer():
+        for x in range(2000):
+            c.add(x)
+        done.set()
+
+    def reader():
+        while not done.is_set():
+            s = c.snapshot()
+            if s and (len(s) != 1 or not s.present(0, s.count())):
+                errors.append(list(s))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert list(c) == [(0, 2000)]
+
+
+def test_ingest():
+    c = ConcurrentRangeSet()
+    snaps = []
+    with c.ingest(buffer=3, on_flush=lambda s: snaps.append(s.snapshot())) as ing:
+        for x in (1, 3, 2, 7, 5):
+            ing.add(x)
+        assert list(c) == [(1, 4)]
+    assert list(c) == [(1, 4), (5, 6), (7, 8)]
+    assert [list(s) for s in snaps] == [[(1, 4)], [(1, 4), (5, 6), (7, 8)]]
@@ -0,0 +1,85 @@
+from range_set import HybridRangeSet, RangeSet
+from range_set.hybrid import CHUNK
+import pickle
+import random
+import pytest
+
+
+def rnd_ops(seed, n, span):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        x = rnd.randrange(-span, span)
+        y = x + (1 if rnd.random() < 0.7 else rnd.randrange(1, CHUNK // 4))
+        yield rnd.random() < 0.7, x, y
+
+
+def test_hybrid_random():
+    h = HybridRangeSet()
+    r = RangeSet()
+    for add, x, y in rnd_ops(21, 3000, 2 * CHUNK):
+        if add:
+            h.add(x, y)
+            r.add(x, y)
+        else:
+            h.discard(x, y)
+            r.discard(x, y)
+    assert list(h) == list(r)
+    assert h.count() == r.count()
+    assert h == r and len(h) == len(r)
+    for x in range(-2 * CHUNK, 2 * CHUNK, 97):
+        assert (x in h) == (x in r)
+
+    h.optimize()
+    assert h == r and h.count() == r.count()
+
+
+def test_hybrid_containers():
+    h = HybridRangeSet()
+    for x in range(0, 1000, 2):
+        h.add(x)  # sparse: array
+    h.add(CHUNK, 2 * CHUNK)  # full: runs
+    for x in range(2 * CHUNK, 3 * CHUNK, 3):
+        h.add(x)  # dense, many holes: bitmap
+    h.add(3 * CHUNK + 5, 3 * CHUNK + 5000)  # one long run
+    assert h.containers() == {"run": 2, "array": 1, "bitmap": 1}
+    assert h.nbytes() < 20000
+
+    h.remove(2 * CHUNK, 3 * CHUNK - 100)
+    assert h.containers() == {"run": 2, "array": 2, "bitmap": 0}
+    h.add(0, CHUNK)
+    assert list(h)[0] == (0, 2 * CHUNK)
+    assert h.containers() == {"run": 3, "array": 1, "bitmap": 0}
+    assert h.present(100, 2 * CHUNK) and not h.present(100, 2 * CHUNK + 1)
+
+
+@pytest.mark.parametrize("op", ["__or__", "__and__", "__sub__", "__xor__"])
+def test_hybrid_algebra(op):
+    a = HybridRangeSet()
+    b = HybridRangeSet()
+    ra = RangeSet()
+    rb = RangeSet()
+    for i, (add, x, y) in enumerate(rnd_ops(op, 2000, 3 * CHUNK)):
+        (a if i & 1 else b).add(x, y)
+        (ra if i & 1 else rb).add(x, y)
+    expect = getattr(ra, op)(rb)
+    res = getattr(a, op)(b)
+    assert list(res) == list(expect)
+    assert res.count() == expect.count()
+    assert list(getattr(a, op)(rb)) == list(expect)
+
+    c = a.copy()
+    getattr(c, op.replace("__", "__i", 1))(b)
+    assert c == expect
+    assert a == ra
+
+
+def test_hybrid_misc():
+    h = HybridRangeSet([1, 2, 3, (10, 20), CHUNK + 5])
+    assert h.to_rangeset() == RangeSet([1, 2, 3, (10, 20), CHUNK + 5])
+    assert pickle.loads(pickle.dumps(h)) == h
+    assert h.pop() == CHUNK + 5
+    with pytest.raises(KeyError):
+        h.remove(100)
+    assert h.issubset(RangeSet([(0, 50)]))
+    assert h.isdisjoint([30, 40])
+    assert not HybridRangeSet()
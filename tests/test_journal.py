@@ -0,0 +1,103 @@
+from range_set import ConcurrentRangeSet, FrozenRangeSet, JournaledRangeSet, RangeSet
+from range_set.journal import SLACK
+import copy
+import json
+import pickle
+import pytest
+
+
+def test_journal():
+    s = JournaledRangeSet([(0, 100)])
+    r = RangeSet()
+    d = s.delta_since(0)
+    assert d.full and d.added == [(0, 100)]
+    token = r.apply_delta(d)
+    assert r == s and token == s.version
+
+    s.add(200, 210)
+    s.remove(50)
+    s.add(50)  # cancels the removal
+    s.discard(205, 300)
+    d = s.delta_since(token)
+    assert not d.full
+    assert d.added == [(50, 51), (200, 205)]
+    assert d.removed == [(205, 300)]
+    token = r.apply_delta(d)
+    assert r == s
+
+    assert s.delta_since(token) == (token, token, False, [], [])
+    with pytest.raises(ValueError):
+        s.delta_since(token + 1)
+    with pytest.raises(KeyError):
+        s.remove(1000)
+    assert s.version == token
+
+
+def test_journal_bulk():
+    s = JournaledRangeSet([(0, 10), (20, 30)])
+    r = RangeSet(s)
+    token = s.version
+    s |= RangeSet([(5, 25)])
+    s -= RangeSet([(0, 2)])
+    token = r.apply_delta(s.delta_since(token))
+    assert r == s == RangeSet([(2, 30)])
+
+
+def test_journal_compact():
+    s = JournaledRangeSet([(0, 10)])
+    r = RangeSet(s)
+    token = s.version
+    for i in range(SLACK + 5):
+        s.add(20 + i)
+    d = s.delta_since(token)
+    assert d.full
+    r.apply_delta(d)
+    assert r == s
+    assert len(s._journal) <= len(s) + SLACK
+
+
+def test_apply_delta_other():
+    s = JournaledRangeSet([1, 2, 3])
+    c = ConcurrentRangeSet()
+    c.apply_delta(s.delta_since(0))
+    assert c == RangeSet([1, 2, 3])
+    with pytest.raises(TypeError):
+        FrozenRangeSet().apply_delta(s.delta_since(0))
+
+    # deltas survive a round trip through JSON
+    d = s.delta_since(0)
+    t = JournaledRangeSet()
+    t.apply_delta(type(d)(*json.loads(json.dumps(d))))
+    assert t == s
+
+
+def test_journal_pickle():
+    s = JournaledRangeSet([(0, 10), (20, 30)])
+    token = s.version
+    s.add(40, 50)
+    s.discard(5)
+    for t in (pickle.loads(pickle.dumps(s)), copy.copy(s), copy.deepcopy(s)):
+        assert t == s
+        assert type(t) is JournaledRangeSet
+        assert t.version == s.version
+        assert t.delta_since(token) == s.delta_since(token)
+        t.add(60)
+        assert t.delta_since(s.version).added == [(60, 61)]
+    assert s.delta_since(token).added == [(40, 50)]
+
+
+def test_journal_new():
+    s = JournaledRangeSet(range(0, 1000, 2)) | RangeSet([5])
+    assert type(s) is JournaledRangeSet and s._journal == []
+    r = RangeSet()
+    assert r.apply_delta(s.delta_since(0)) == s.version
+    assert r == s
+
+    e = JournaledRangeSet()
+    token = e.version
+    e |= RangeSet([(1, 5)])
+    assert e.version > token and e._journal == []
+    d = e.delta_since(token)
+    assert d.full and d.added == [(1, 5)]
+    e.add(10)
+    assert e.delta_since(e.version - 1).added == [(10, 11)]
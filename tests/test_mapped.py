@@ -0,0 +1,106 @@
+from array import array
+from range_set import RangeSet, MappedRangeSet, serial
+import pickle
+import pytest
+
+
+def test_mapped(tmp_path):
+    p = tmp_path / "set"
+    c = RangeSet((1, 2, 3, 5, (10, 20), -7))
+    c.to_file(p)
+
+    with MappedRangeSet(p) as m:
+        assert m == c
+        assert list(m) == list(c)
+        assert len(m) == len(c)
+        assert m.count() == c.count()
+        for x in range(-10, 25):
+            assert (x in m) == (x in c), x
+        assert m.present(10, 20)
+        assert not m.present(9, 20)
+        assert m.absent(6, 10)
+        assert m.issubset(c)
+        assert m.issuperset(c)
+        assert not m.isdisjoint(c)
+        assert m.rank(11) == c.rank(11)
+
+        d = m | RangeSet((4,))
+        assert type(d) is RangeSet
+        assert d == RangeSet((1, 2, 3, 4, 5, (10, 20), -7))
+        assert m - c == RangeSet()
+
+        with pytest.raises(TypeError):
+            m.add(4)
+        with pytest.raises(TypeError):
+            m.remove(1)
+        with pytest.raises(TypeError):
+            m.update(c)
+
+        mm = m
+        mm |= RangeSet((4,))
+        assert type(mm) is RangeSet
+        assert mm == d
+        assert m == c
+
+        e = m.copy()
+        e.add(4)
+        assert e == d
+
+        assert pickle.loads(pickle.dumps(m)) == c
+
+
+def test_mapped_empty(tmp_path):
+    p = tmp_path / "set"
+    RangeSet().to_file(p)
+    m = MappedRangeSet(p)
+    assert not m
+    assert 1 not in m
+    assert m.count() == 0
+    m.close()
+
+
+def test_mapped_bad(tmp_path):
+    p = tmp_path / "set"
+    p.write_bytes(RangeSet((1, 2, (1000, 1 << 40))).to_bytes(fixed=False))
+    with pytest.raises(ValueError):
+        MappedRangeSet(p)
+
+
+def test_mapped_copy(tmp_path):
+    p = tmp_path / "set"
+    RangeSet((1, 2, 3, 7)).to_file(p)
+    m = MappedRangeSet(p)
+    c = m.copy()
+    f = m.freeze()
+    assert f is m
+    m.close()
+    assert not m
+    assert c == RangeSet((1, 2, 3, 7))
+    c.add(4)
+    assert c == RangeSet((1, 2, 3, 4, 7))
+    assert not m._mmap.closed
+
+    # copies that have stopped using the mapping don't keep it open
+    m = MappedRangeSet(p)
+    c = m.copy()
+    c.add(4)
+    d = m.copy()
+    del d
+    m.close()
+    assert m._mmap.closed
+
+
+def test_mapped_copied(tmp_path, monkeypatch):
+    # what happens on systems that are not little-endian
+    decode = serial.decode
+    monkeypatch.setattr(serial, "decode", lambda data, verify: array("q", decode(data, verify)))
+    p = tmp_path / "set"
+    RangeSet((1, 2, 3, 7)).to_file(p)
+    m = MappedRangeSet(p)
+    assert m == RangeSet((1, 2, 3, 7)) and 7 in m
+    assert m._mmap.closed
+    c = m.copy()
+    c.add(4)
+    assert m == RangeSet((1, 2, 3, 7))
+    m.close()
+    assert not m and c == RangeSet((1, 2, 3, 4, 7))
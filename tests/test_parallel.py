@@ -0,0 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+from range_set import RangeSet, IntervalArray, parallel
+import random
+import pytest
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(2) as ex:
+        yield ex
+
+
+def rnd_set(seed, n, store=None):
+    rnd = random.Random(seed)
+    res = []
+    x = 0
+    for _ in range(n):
+        x += rnd.randrange(1, 6)
+        y = x + rnd.randrange(1, 6)
+        res.append((x, y))
+        x = y
+    return RangeSet(res, store=store)
+
+
+@pytest.mark.parametrize("workers", [1, 3, 7])
+def test_parallel(executor, workers):
+    a = rnd_set(1, 300, store=IntervalArray)
+    b = rnd_set(2, 250)
+    kw = dict(workers=workers, threshold=0, executor=executor)
+
+    r = parallel.union(a, b, **kw)
+    assert r == a | b and type(r._set) is IntervalArray
+    assert parallel.intersection(a, b, **kw) == a & b
+    assert parallel.difference(a, b, **kw) == a - b
+    assert parallel.difference(b, a, **kw) == b - a
+    assert parallel.union(a, RangeSet(), **kw) == a
+    assert parallel.union(RangeSet(), a, **kw) == a
+
+    c = RangeSet(a)
+    c |= RangeSet()  # drops the cached count
+    assert parallel.count(c, **kw) == a.count()
+    assert parallel.issubset(a & b, a, **kw)
+    assert parallel.issubset(a, a, **kw)
+    assert not parallel.issubset(a, a, proper=True, **kw)
+    assert parallel.issubset(a & b, a, proper=True, **kw)
+    assert not parallel.issubset(a, b, **kw)
+
+
+def test_parallel_serial():
+    a = rnd_set(1, 30)
+    b = rnd_set(2, 30)
+    assert parallel.union(a, b) == a | b
+    assert parallel.issubset(a, b) == a.issubset(b)
+    assert parallel.count(a) == a.count()
+
+
+def test_parallel_pool():
+    a = rnd_set(3, 100)
+    b = rnd_set(4, 100)
+    assert parallel.intersection(a, b, workers=2, threshold=10) == a & b
+
+
+def test_parallel_splits(executor):
+    a = rnd_set(5, 100)
+    b = RangeSet([(x + 10000, y + 10000) for x, y in rnd_set(6, 300)])
+    sp = parallel._splits((a, b), 4)
+    assert len(sp) == 5 and all(x > 10000 for x in sp[1:-1])
+    kw = dict(workers=4, threshold=0, executor=executor)
+    assert parallel.union(a, b, **kw) == a | b
+
+    big = RangeSet([(1 << 70, (1 << 70) + 5)])
+    assert parallel.union(a, big, **kw) == a | big
+    assert parallel.issubset(big, big | a, **kw)
+    assert parallel.count(big, **kw) == 5
@@ -0,0 +1,70 @@
+from range_set import RangeDict, RangeSet
+import random
+import pytest
+
+
+def test_rangedict():
+    d = RangeDict()
+    d[0:10] = "a"
+    d[20:30] = "b"
+    d[5:25] = "c"
+    assert list(d.items()) == [((0, 5), "a"), ((5, 25), "c"), ((25, 30), "b")]
+    assert d[4] == "a" and d[5] == "c" and d[29] == "b"
+    with pytest.raises(KeyError):
+        d[30]
+    assert d.get(-1, "x") == "x"
+
+    d[10:12] = "x"  # split
+    assert list(d.items()) == [
+        ((0, 5), "a"),
+        ((5, 10), "c"),
+        ((10, 12), "x"),
+        ((12, 25), "c"),
+        ((25, 30), "b"),
+    ]
+    d[10:12] = "c"  # merged again
+    assert list(d) == [(0, 5), (5, 25), (25, 30)]
+    d.set(25, 27, "c")
+    d[30] = "b"
+    assert list(d.items()) == [((0, 5), "a"), ((5, 27), "c"), ((27, 31), "b")]
+
+    del d[3:28]
+    assert list(d.items()) == [((0, 3), "a"), ((28, 31), "b")]
+    with pytest.raises(KeyError):
+        del d[10]
+    assert not d.delete(10, 20)
+    assert list(d.overlapping(2, 29)) == [((0, 3), "a"), ((28, 31), "b")]
+    assert list(d.overlapping(3, 28)) == []
+    assert d.keys() == RangeSet([(0, 3), (28, 31)])
+    assert d.count() == 6
+    assert 2 in d and 3 not in d
+
+    d[3:28] = "a"
+    assert d.keys() == RangeSet([(0, 31)]) and len(d) == 2
+    e = d.copy()
+    e[0] = "z"
+    assert e != d and d[0] == "a"
+    assert RangeDict(d.items()) == d
+
+
+def test_rangedict_random():
+    rnd = random.Random(23)
+    d = RangeDict()
+    ref = {}
+    for _ in range(500):
+        x = rnd.randrange(100)
+        y = x + rnd.randrange(1, 20)
+        if rnd.random() < 0.3:
+            d.delete(x, y)
+            for k in range(x, y):
+                ref.pop(k, None)
+        else:
+            v = rnd.randrange(3)
+            d[x:y] = v
+            for k in range(x, y):
+                ref[k] = v
+        for k in range(-1, 122):
+            assert d.get(k) == ref.get(k), k
+        items = list(d.items())
+        for ((_, e), v), ((s, _), w) in zip(items, items[1:]):
+            assert e < s or v != w
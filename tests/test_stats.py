@@ -0,0 +1,75 @@
+from range_set import InstrumentedRangeSet, RangeSet, IntervalArray, IntervalChunks
+import pickle
+import random
+import pytest
+
+
+def test_stats():
+    s = InstrumentedRangeSet(range(0, 20, 2))
+    st = s.stats
+    s.add(100)  # append
+    s.add(5)  # joins (4, 5) and (6, 7)
+    s.add(51)  # insert before (100, 101)
+    assert (st.add, st.add_fast, st.add_slow) == (3, 2, 1)
+    assert st.shift_hist == {0: 1, 1: 1, 4: 1}
+
+    s.remove(10)  # deletes an interval
+    s.remove(5)  # splits (4, 7)
+    s.discard(1000)
+    with pytest.raises(KeyError):
+        s.remove(1001)
+    assert (st.remove, st.remove_fast, st.remove_slow, st.remove_miss) == (4, 1, 1, 2)
+    assert st.shifts == 5
+    assert st.find > 0 and st.find_max_steps <= st.find_steps
+
+    d = st.as_dict()
+    assert d["add"] == 3 and d["shift_total"] == st.shift_total
+    st.reset()
+    assert st.as_dict()["find"] == 0 and st.shift_hist == {}
+
+    c = s.copy()
+    assert type(c) is InstrumentedRangeSet and c.stats is not st
+    p = pickle.loads(pickle.dumps(s))
+    assert p == s and p.stats.add == 0
+
+
+def test_stats_find():
+    rnd = random.Random(19)
+    s = InstrumentedRangeSet(range(0, 2000, 3), store=IntervalArray)
+    r = RangeSet(s)
+    for _ in range(300):
+        x = rnd.randrange(-5, 2005)
+        assert s._find(x) == r._find(x), x
+    assert s.stats.find == 300
+    assert s.stats.find_max_steps <= 12
+
+
+@pytest.mark.parametrize("store", [None, IntervalArray, IntervalChunks])
+def test_fragmentation(store):
+    s = RangeSet([(0, 1), (2, 4), (10, 13), (20, 100)], store=store)
+    f = s.fragmentation()
+    assert f["intervals"] == 4
+    assert f["elements"] == 86
+    assert f["lengths"] == {1: 1, 2: 2, 64: 1}
+    assert f["gaps"] == {1: 1, 4: 2}
+    assert f["bytes"] > 0
+    assert RangeSet().fragmentation()["lengths"] == {}
+
+
+def test_stats_find_finger():
+    # the default store searches from its last position
+    s = InstrumentedRangeSet(range(0, 30000, 3))
+    for x in range(10000, 11000):
+        s._find(x)
+    seq = s.stats.find_steps
+    s.stats.reset()
+    rnd = random.Random(20)
+    for _ in range(1000):
+        s._find(rnd.randrange(30000))
+    assert seq * 2 < s.stats.find_steps
+
+
+def test_stats_find_chunks():
+    s = InstrumentedRangeSet(range(0, 30000, 3), store=IntervalChunks)
+    assert s._find(3001) == RangeSet(s)._find(3001)
+    assert 0 < s.stats.find_steps <= 20